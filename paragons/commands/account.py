@@ -1,6 +1,55 @@
-from evennia import CmdSet 
+from evennia import CmdSet
+from evennia.utils.evtable import EvTable
+
+from .command import Command
+
+_ON = ("on", "yes", "true", "1")
+_OFF = ("off", "no", "false", "0")
+
+
+class CmdSettings(Command):
+    """
+    View or change your account settings.
+
+    Usage:
+        - `settings`
+        - `settings <setting> <on|off>`
+
+    Example:
+        - `settings auto attack off`
+        - `settings auto prompt on`
+    """
+    key = "settings"
+    aliases = ("setting",)
+    help_category = "general"
+
+    def parse(self):
+        self.args = self.args.strip().lower()
+        self.setting, _, self.value = self.args.rpartition(" ")
+
+    def func(self):
+        settings = self.account.settings
+
+        if not self.args:
+            table = EvTable("Setting", "Value", border="rows")
+            for key, value in settings.all():
+                table.add_row(key, "on" if value else "off")
+            self.msg(str(table))
+            return
+
+        if not (name := settings.find(self.setting)):
+            self.msg(f"There's no setting called {self.setting or self.args}.")
+            return
+        if self.value not in _ON + _OFF:
+            self.msg(f"Turn {self.setting} on or off?")
+            return
+
+        setattr(settings, name, self.value in _ON)
+        self.msg(f"{self.setting.capitalize()} is now {'on' if self.value in _ON else 'off'}.")
 
 
 class AccountOptsCmdSet(CmdSet):
-    pass
+    def at_cmdset_creation(self):
+        super().at_cmdset_creation()
 
+        self.add(CmdSettings)
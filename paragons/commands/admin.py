@@ -0,0 +1,229 @@
+import time
+from evennia import CmdSet
+from evennia.utils.evtable import EvTable
+
+from .command import Command
+from world import cmdstats, lag, logins, offload, profiler
+
+
+class CmdCmdStats(Command):
+    """
+    Show how long commands take to run.
+
+    Usage:
+        - `cmdstats [<amount>]`
+        - `cmdstats sort <runs|total|max|queries|messages>`
+        - `cmdstats hist <command>`
+        - `cmdstats export`
+        - `cmdstats reset`
+
+    Lists the slowest commands by total time taken, with the mean time each
+    part of them took, latency percentiles, and the mean database queries and
+    messages sent per run. Times are in milliseconds.
+
+    `hist` shows the latency histogram for one command, and `export` writes
+    everything to a text file in the server's log directory.
+    """
+    key = "cmdstats"
+    locks = "cmd:perm(Developer)"
+    help_category = "admin"
+
+    sort_options = {
+        "runs": "count",
+        "total": "total",
+        "max": "max",
+        "queries": "queries",
+        "messages": "messages",
+    }
+
+    def parse(self):
+        self.args = self.args.strip().lower()
+        self.action, _, self.rest = self.args.partition(" ")
+        self.rest = self.rest.strip()
+
+    def func(self):
+        if not self.args or self.args.isdecimal():
+            limit = int(self.args) if self.args else 20
+            self.msg(f"|wSlowest commands|n\n{cmdstats.stats_table(limit=limit)}")
+            return
+
+        if self.action == "reset":
+            cmdstats.reset_stats()
+            self.msg("Command stats reset.")
+        elif self.action == "export":
+            self.msg(f"Command stats written to {cmdstats.export_stats()}.")
+        elif self.action == "hist":
+            if not (table := cmdstats.histogram_table(self.rest)):
+                self.msg(f"'{self.rest}' hasn't been run.")
+                return
+            self.msg(f"|wLatency for {self.rest}|n\n{table}")
+        elif self.action == "sort":
+            if not (sort := self.sort_options.get(self.rest)):
+                self.msg(f"Sort by one of: {', '.join(self.sort_options)}")
+                return
+            self.msg(str(cmdstats.stats_table(sort=sort)))
+        else:
+            self.msg("Usage: cmdstats [<amount>|sort|hist|export|reset]")
+
+
+class CmdProfile(Command):
+    """
+    Profile what the server is doing, by sampling it.
+
+    Usage:
+        - `profile`
+        - `profile start [<samples per second>]`
+        - `profile stop`
+
+    While it's running, `profile` shows the functions the server is spending
+    the most time in. Stopping it writes everything sampled to a file in the
+    server's log directory, for turning into a flamegraph. It stops by itself
+    after ten minutes.
+    """
+    key = "profile"
+    locks = "cmd:perm(Developer)"
+    help_category = "admin"
+
+    def parse(self):
+        self.action, _, rate = self.args.strip().lower().partition(" ")
+        self.rate = int(rate) if rate.strip().isdecimal() else profiler.DEFAULT_RATE
+
+    def func(self):
+        prof = profiler.PROFILER
+
+        if self.action == "start":
+            if not prof.start(self.rate):
+                self.msg("The profiler is already running.")
+                return
+            self.msg(f"Profiling at {prof.rate} samples a second.")
+        elif self.action == "stop":
+            sampling = prof.sampling
+            # it may have stopped by itself, but still needs writing out
+            if filename := prof.stop():
+                self.msg(f"Profiler stopped after {prof.samples} samples, written to {filename}.")
+            elif sampling:
+                self.msg("Profiler stopped without taking any samples.")
+            else:
+                self.msg("The profiler isn't running.")
+        elif not self.action:
+            if not prof.samples:
+                self.msg("Nothing has been sampled. Use |wprofile start|n to begin.")
+                return
+            status = "running" if prof.sampling else "stopped"
+            table = EvTable("function", "top %", "total %", border="header")
+            for name, own, total in prof.top():
+                table.add_row(
+                    name, f"{own / prof.samples * 100:.1f}", f"{total / prof.samples * 100:.1f}"
+                )
+            self.msg(f"|wProfiler ({status}, {prof.samples} samples)|n\n{table}")
+        else:
+            self.msg("Usage: profile [start [<rate>]|stop]")
+
+
+class CmdLag(Command):
+    """
+    Show how far behind the server is running.
+
+    Usage:
+        - `lag`
+        - `lag <stall number>`
+
+    Shows lag percentiles over the last few minutes, and the recent stalls -
+    times something kept everything else waiting - with what was running.
+    Give a stall's number to see the full stack it was caught in.
+
+    Also shows how busy the pools running offloaded work are.
+    """
+    key = "lag"
+    locks = "cmd:perm(Developer)"
+    help_category = "admin"
+
+    def func(self):
+        monitor = lag.LAG_MONITOR
+        stalls = list(monitor.stalls)
+
+        if (args := self.args.strip()).isdecimal():
+            if not 0 < int(args) <= len(stalls):
+                self.msg(f"There's no stall {args}.")
+                return
+            stall = stalls[-int(args)]
+            if not stall.stack:
+                self.msg("That stall ended before its stack could be taken.")
+                return
+            self.msg(f"|wStall {args} ({stall.lag * 1000:.0f}ms)|n\n" + "\n".join(stall.stack))
+            return
+
+        p50, p90, p99, worst = (seconds * 1000 for seconds in monitor.percentiles(50, 90, 99, 100))
+        lines = [
+            f"|wLag|n over the last {len(monitor.lags)} heartbeats: "
+            f"p50 {p50:.1f}ms, p90 {p90:.1f}ms, p99 {p99:.1f}ms, max {worst:.1f}ms"
+        ]
+        if stalls:
+            table = EvTable("#", "when", "ms", "running", "where", border="header")
+            for num, stall in enumerate(reversed(stalls), start=1):
+                table.add_row(
+                    num,
+                    time.strftime("%H:%M:%S", time.localtime(stall.when)),
+                    f"{stall.lag * 1000:.0f}",
+                    stall.running or "-",
+                    stall.where or "-",
+                )
+            lines.append(str(table))
+        else:
+            lines.append("No stalls recorded.")
+
+        table = EvTable(
+            "pool", "size", "pending", "max", "done", "failed", "wait ms", "run ms",
+            border="header",
+        )
+        for pool in offload.OFFLOAD.stats.values():
+            table.add_row(
+                pool.name,
+                pool.size,
+                pool.pending,
+                pool.max_pending,
+                pool.done,
+                pool.failed,
+                f"{pool.waited / pool.done * 1000:.1f}" if pool.done else "-",
+                f"{pool.ran / pool.done * 1000:.1f}" if pool.done else "-",
+            )
+        lines.extend(("|wOffloaded work|n", str(table)))
+        self.msg("\n".join(lines))
+
+
+class CmdLogins(Command):
+    """
+    Show how long logging in takes.
+
+    Usage:
+        - `logins`
+
+    Shows percentiles, in seconds, over the most recent logins, for how long
+    the server took to log an account in once it got the connect command,
+    and to put a character in the world once asked to. The last line is the
+    time from connecting to the first prompt, which includes the player's
+    own typing and is only a rough guide.
+    """
+    key = "logins"
+    locks = "cmd:perm(Developer)"
+    help_category = "admin"
+
+    def func(self):
+        table = EvTable("stage", "logins", "p50", "p90", "p99", "max", border="header")
+        for stage in logins.STAGES:
+            table.add_row(
+                stage,
+                logins.count(stage),
+                *(f"{seconds:.2f}" for seconds in logins.percentiles(stage, 50, 90, 99, 100)),
+            )
+        self.msg(f"|wLogin times|n\n{table}")
+
+
+class AdminCmdSet(CmdSet):
+    def at_cmdset_creation(self):
+        super().at_cmdset_creation()
+
+        self.add(CmdCmdStats)
+        self.add(CmdProfile)
+        self.add(CmdLag)
+        self.add(CmdLogins)
@@ -91,15 +91,11 @@ class CmdAttack(Command):
         self.caller.db.combat_target = target 
         self.caller.attack(target, weapon)
 
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto attack"):
-                self.msg("[ Auto attack is ON]")
+        if self.account and self.account.settings.auto_attack:
+            self.msg("[ Auto attack is ON]")
 
     def at_post_cmd(self):
-        if self.account and (settings := self.account.db.settings):
-            if settings.get('auto prompt'):
-                status = self.caller.get_display_status(self.caller)
-                self.msg(prompt=status)
+        self.caller.vitals.update()
 
 
 
@@ -203,10 +199,7 @@ class CmdFlee(Command):
         self.execute_cmd(flee_dir.name)
 
     def at_post_cmd(self):
-        if self.account and (settings := self.account.db.settings):
-            if settings.get("auto prompt"):
-                status = self.caller.get_display_status(self.caller)
-                self.msg(prompt=status)
+        self.caller.vitals.update()
 
 
 
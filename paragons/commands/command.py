@@ -6,6 +6,10 @@ Commands describe the input the account can do to the game.
 """
 
 from evennia.commands.command import Command as BaseCommand
+from evennia.utils import logger
+
+from world.cmdstats import PHASES, timed
+from world.offload import run_offloaded
 
 # from evennia import default_cmds
 
@@ -30,7 +34,35 @@ class Command(BaseCommand):
     #     - at_post_cmd(): Extra actions, often things done after
     #         every command, like prompts.
     #
-    pass
+    # parse(), func() and at_post_cmd() are timed for `cmdstats`, see
+    # world/cmdstats.py.
+
+    # the current run's CommandTiming
+    _timing = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for phase in PHASES:
+            method = cls.__dict__.get(phase)
+            if method and not getattr(method, "timed", False):
+                setattr(cls, phase, timed(phase, method))
+
+    def at_post_cmd(self):
+        # timed even when a command has none of its own, to record the run
+        pass
+
+    at_post_cmd = timed("at_post_cmd", at_post_cmd)
+
+    def msg_offloaded(self, fn, *args, **kwargs):
+        """
+        Send the caller the text `fn(*args, **kwargs)` returns, working it
+        out in a worker thread. For big tables and the like, built from data
+        that's been gathered already.
+        """
+        deferred = run_offloaded(fn, *args, **kwargs)
+        deferred.addCallback(self.msg)
+        deferred.addErrback(lambda failure: logger.log_err(failure.getTraceback()))
+        return deferred
 
 
 # -------------------------------------------------------------
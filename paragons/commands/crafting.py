@@ -0,0 +1,151 @@
+from evennia import CmdSet, GLOBAL_SCRIPTS
+from evennia.utils.evtable import EvTable
+from evennia.contrib.game_systems.crafting.crafting import CmdCraft as ContribCmdCraft
+
+from .command import Command
+from world.recipes.registry import craftable, search_recipe
+
+_MAX_BATCH = 50
+
+
+class CmdCraft(Command, ContribCmdCraft):
+    """
+    Craft an item using ingredients and tools.
+
+    Usage:
+        - `craft [<amount>] <recipe>`
+        - `craft <recipe> from <ingredient>,... [using <tool>,...]`
+
+    Example:
+        - `craft iron ingot`
+        - `craft 20 iron ingot`
+        - `craft dagger from short iron blade, bone hilt, small guard piece, small pommel piece`
+
+    Without any ingredients or tools listed, they're picked from what you have
+    on hand. Use `recipes` to see what you can craft.
+    """
+    help_category = "crafting"
+
+    def parse(self):
+        first, *rest = self.args.strip().split(" ", maxsplit=1)
+        if rest and first.isdecimal():
+            self.count = int(first)
+            self.args = rest[0]
+        else:
+            self.count = 1
+
+        super().parse()
+        if not self.recipe:
+            self.recipe = self.args
+
+    def func(self):
+        if any(self.ingredients) or any(self.tools):
+            if self.count != 1:
+                self.msg("You can only craft more than one at a time without listing ingredients.")
+                return
+            super().func()
+            return
+
+        if not self.recipe:
+            self.msg("Craft what?")
+            return
+        if not 0 < self.count <= _MAX_BATCH:
+            self.msg(f"You can craft between 1 and {_MAX_BATCH} at a time.")
+            return
+        if not (recipe := search_recipe(self.recipe)):
+            self.msg(f"You don't know how to craft {self.recipe}.")
+            return
+
+        recipe.craft_batch(self.caller, self.count)
+
+
+class CmdRecipes(Command):
+    """
+    See what you can craft with the tools and materials you have on hand.
+
+    Usage:
+        - `recipes`
+    """
+    key = "recipes"
+    aliases = ("craftable",)
+    help_category = "crafting"
+
+    def func(self):
+        recipes = craftable(self.caller)
+        if not recipes:
+            self.msg("You can't craft anything with what you have right now.")
+            return
+
+        table = EvTable("Recipe", "Skill", border="rows")
+        for recipe in recipes:
+            skill, difficulty = recipe.skill
+            table.add_row(recipe.name, f"{skill} {difficulty}" if skill else "")
+
+        self.msg(str(table))
+
+
+class CmdCraftQueue(Command):
+    """
+    Queue up crafting to work on over time, instead of one craft at a time.
+    Queued crafts are made in order, each taking a little while.
+
+    Usage:
+        - `queue`
+        - `queue [<amount>] <recipe>`
+        - `queue clear`
+
+    Example:
+        - `queue 10 iron ingot`
+        - `queue 2 long iron blade`
+    """
+    key = "queue"
+    aliases = ("craftqueue",)
+    help_category = "crafting"
+
+    def parse(self):
+        self.args = self.args.strip().lower()
+        first, *rest = self.args.split(" ", maxsplit=1)
+
+        if rest and first.isdecimal():
+            self.count = int(first)
+            self.args = " ".join(rest)
+        else:
+            self.count = 1
+
+    def func(self):
+        crafting = GLOBAL_SCRIPTS.crafting
+
+        if not self.args:
+            if not (jobs := crafting.get_jobs(self.caller)):
+                self.msg("You don't have any crafting queued.")
+                return
+            table = EvTable("Recipe", "Left", border="rows")
+            for name, remaining, _ in jobs:
+                table.add_row(name, remaining)
+            self.msg(str(table))
+            return
+
+        if self.args in ("clear", "stop", "cancel"):
+            crafting.clear_jobs(self.caller)
+            self.msg("You clear your crafting queue.")
+            return
+
+        if not 0 < self.count <= _MAX_BATCH:
+            self.msg(f"You can queue between 1 and {_MAX_BATCH} at a time.")
+            return
+        if not (recipe := search_recipe(self.args)):
+            self.msg(f"You don't know how to craft {self.args}.")
+            return
+
+        crafting.add_job(self.caller, recipe, self.count)
+        self.msg(f"You queue up {self.count} {recipe.name}.")
+
+
+class CraftCmdSet(CmdSet):
+    key = "Craft CmdSet"
+
+    def at_cmdset_creation(self):
+        super().at_cmdset_creation()
+        self.add(CmdCraft)
+        self.add(CmdRecipes)
+        self.add(CmdCraftQueue)
@@ -19,12 +19,14 @@ from evennia.contrib.game_systems.clothing import ClothedCharacterCmdSet
 from evennia.contrib.game_systems.containers.containers import ContainerCmdSet
 from evennia.contrib.grid.xyzgrid.commands import XYZGridCmdSet
 from evennia.contrib.rpg.character_creator.character_creator import ContribCmdChargenCreate
-from evennia.contrib.game_systems.crafting.crafting import CmdCraft
 
 from commands.combat import CombatCmdSet
+from commands.crafting import CraftCmdSet
 from commands.skills import SkillCmdSet 
 from commands.interact import InteractCmdSet 
 from commands.account import AccountOptsCmdSet
+from commands.admin import AdminCmdSet
+from commands.unloggedin import CmdUnconnectedConnect, CmdUnconnectedLook
 from command.shops import CmdMoney
 
 
@@ -49,7 +51,7 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         self.add(CmdMoney)
         self.add(ContainerCmdSet)
         self.add(XYZGridCmdSet)
-        self.add(CmdCraft)
+        self.add(CraftCmdSet)
         self.add(CombatCmdSet)
         self.add(SkillCmdSet)
         self.add(InteractCmdSet)
@@ -76,6 +78,7 @@ class AccountCmdSet(default_cmds.AccountCmdSet):
         #
         self.add(ContribCmdChargenCreate)
         self.add(AccountOptsCmdSet)
+        self.add(AdminCmdSet)
         
 
 
@@ -95,6 +98,8 @@ class UnloggedinCmdSet(default_cmds.UnloggedinCmdSet):
         #
         # any commands you add below will overload the default ones.
         #
+        self.add(CmdUnconnectedConnect)
+        self.add(CmdUnconnectedLook)
 
 
 class SessionCmdSet(default_cmds.SessionCmdSet):
@@ -7,6 +7,13 @@ from .command import Command
 class CmdGather(Command):
     """\ 
     Gather resources from the node in this location.
+
+    Usage:
+        - `gather`
+        - `gather all`
+        - `gather stop`
+
+    With `all`, you keep gathering until there's nothing left or you stop.
     """ 
     key = "gather"
     aliases = ("collect", "harvest", "mine", "hunt")
@@ -14,9 +21,19 @@ class CmdGather(Command):
     def func(self):
         if not self.obj:
             return 
-        
+
+        args = self.args.strip().lower()
         try:
-            self.obj.at_gather(self.caller)
+            if args == "all":
+                self.obj.start_gathering(self.caller)
+            elif args == "stop":
+                if not (state := self.caller.ndb.gathering):
+                    self.msg("You aren't gathering anything.")
+                    return
+                # the node being gathered from, not necessarily this one
+                state["node"].stop_gathering(self.caller)
+            else:
+                self.obj.at_gather(self.caller)
         except AttributeError:
             self.msg("You cannot gather anything from that.")
 
@@ -55,6 +72,7 @@ class CmdEat(Command):
         
         energy = obj.attributes.get("energy", 0)
         self.caller.traits.ep.current += energy 
+        self.caller.vitals.changed()
         self.caller.at_emote(
             f"$conj({self.cmdstring}) the {{target}}.",
             mapping={"target": obj}
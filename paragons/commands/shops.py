@@ -5,6 +5,12 @@ from evennia.utils.evtable import EvTable
 from commands import Command
 
 
+def _render_listings(listings):
+    table = EvTable("Item", "Amt", "Price", border="rows")
+    for row in listings:
+        table.add_row(*row)
+    return str(table)
+
 
 class CmdList(Command):
     """
@@ -31,11 +37,7 @@ class CmdList(Command):
             self.msg("This shop has nothing for sale right now.")
             return 
         
-        table = EvTable("Item", "Amt", "Price", border="rows")
-        for key, val in condensed.items():
-            table.add_row(key[0], val, key[1])
-
-        self.msg(str(table))
+        self.msg_offloaded(_render_listings, listings)
 
 
 
@@ -106,6 +108,7 @@ class CmdBuy(Command):
         
         for obj in objs:
             obj.location = self.caller
+            self.caller.carried.add(obj)
 
         self.caller.db.coins -= total
 
@@ -165,6 +168,7 @@ class CmdSell(Command):
             return 
         
         for obj in objs:
+            self.caller.carried.remove(obj)
             self.obj.add_stock(obj)
 
         coins = self.caller.db.coins or 0
@@ -11,6 +11,15 @@ SKILL_DICT = {
 }
 
 
+def _render_sheet(stats, skills):
+    return "\n".join((
+        "STATS",
+        str(EvTable(table=stats, border="none")),
+        "SKILLS",
+        str(EvTable(table=skills, border="none")),
+    ))
+
+
 class CmdStatSheet(Command):
     """\
     View your character's current stats.
@@ -23,24 +32,16 @@ class CmdStatSheet(Command):
         self.msg(f"|w{caller.name}|n")
         self.msg(caller.get_display_status(caller))
 
-        self.msg("STATS")
         stats = [
             ["Strength", caller.db.str or 0],
             ["Agility", caller.db.agi or 0],
             ["Willpower", caller.db.wil or 0],
         ]
-        rows = list(zip(*stats))
-        table = EvTable(table=row, border="none")
-        self.msg(str(table))
-
-        self.msg("SKILLS")
         skills = []
         for skill_key in sorted(SKILL_DICT.items()):
             if skill := caller.traits.get(skill_key):
                 skills.append((skill.name, int(skill.value)))
-        rows = list(zip(*skills))
-        table = EvTable(table=rows, border="none")
-        self.msg(str(table))
+        self.msg_offloaded(_render_sheet, list(zip(*stats)), list(zip(*skills)))
 
 
 class CmdTrainSkill(Command):
@@ -0,0 +1,64 @@
+from random import choice
+from django.conf import settings
+from evennia import default_cmds
+from evennia.utils import callables_from_module, string_from_module
+
+from world import logins
+
+# the connection screens, read from their module once
+_SCREENS = []
+
+
+def connection_screen():
+    """
+    Pick a connection screen. Screens given as strings are only looked up
+    the first time; a `connection_screen()` function in the module is still
+    called every time, since that's for screens that change.
+    """
+    if not _SCREENS:
+        callables = callables_from_module(settings.CONNECTION_SCREEN_MODULE)
+        if screen_func := callables.get("connection_screen"):
+            _SCREENS.append(screen_func)
+        else:
+            screens = string_from_module(settings.CONNECTION_SCREEN_MODULE)
+            _SCREENS.extend(
+                screens or ["No connection screen found. Please contact an admin."]
+            )
+    screen = choice(_SCREENS)
+    return screen() if callable(screen) else screen
+
+
+class CmdUnconnectedLook(default_cmds.CmdUnconnectedLook):
+    """
+    look when in unlogged-in state
+
+    Usage:
+      look
+
+    This is an unconnected version of the look command for simplicity.
+
+    This is called by the server and kicks everything in gear.
+    All it does is display the connect screen.
+    """
+
+    def func(self):
+        self.caller.msg(connection_screen())
+
+
+class CmdUnconnectedConnect(default_cmds.CmdUnconnectedConnect):
+    """
+    connect to the game
+
+    Usage (at login screen):
+      connect accountname password
+      connect "account name" "pass word"
+
+    Use the create command to first create an account before logging in.
+
+    If you have spaces in your name, enclose it in double quotes.
+    """
+
+    def at_pre_cmd(self):
+        # timed for the login stats, until the end of Account.at_post_login
+        logins.start(self.caller, "login")
+        return super().at_pre_cmd()
@@ -30,7 +30,12 @@ def at_server_start():
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
-    pass
+    from world.recipes.registry import build_index
+    from world.spawning import precompile_prototypes
+
+    build_index()
+    # raises if any prototype is broken, so it's caught before anyone spawns it
+    precompile_prototypes()
 
 
 def at_server_stop():
@@ -38,7 +43,12 @@ def at_server_stop():
     This is called just before the server is shut down, regardless
     of it is for a reload, reset or shutdown.
     """
-    pass
+    from world.cooldowns import save_cooldowns
+    from world.cmdstats import export_stats
+
+    save_cooldowns()
+    # command stats don't survive a reload, so keep the last of them
+    export_stats()
 
 
 def at_server_reload_start():
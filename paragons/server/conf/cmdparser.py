@@ -1,35 +1,136 @@
 """
-Changing the default command parser
+Command parser
 
-The cmdparser is responsible for parsing the raw text inserted by the
-user, identifying which command/commands match and return one or more
-matching command objects. It is called by Evennia's cmdhandler and
-must accept input and return results on the same form. The default
-handler is very generic so you usually don't need to overload this
-unless you have very exotic parsing needs; advanced parsing is best
-done at the Command.parse level.
+A replacement for Evennia's default command parser. The default one asks
+every command in the merged cmdset whether the input starts with any of its
+keys or aliases, so it gets slower the more commands and aliases there are.
 
-The default cmdparser understands the following command combinations
-(where [] marks optional parts.)
+This one compiles each merged cmdset into a prefix trie of every key and
+alias, once, and then walks the input through it - so finding the
+candidates only depends on how long the input is. Everything after that
+(access checks, picking between multiple matches, `1-cmd` style indexes)
+works exactly like the default parser.
 
-[cmdname[ cmdname2 cmdname3 ...] [the rest]
+Evennia caches merged cmdsets by the cmdsets that went into them, but only
+weakly - nothing holds on to a merge once the command is done, so without
+help the whole stack is merged again on every input. The most recently used
+merges are kept here along with their tries, which keeps them in Evennia's
+cache too. Changing a cmdset on any of the stacks (adding, removing or
+updating one) makes a new merge, and the old one ages out.
 
-A command may consist of any number of space-separated words of any
-length, and contain any character. It may also be empty.
+Enabled with `COMMAND_PARSER` in the settings.
+"""
+from collections import OrderedDict
+from django.conf import settings
+from evennia.commands.command import Command
+from evennia.commands.cmdparser import create_match, try_num_differentiators
+from evennia.utils.logger import log_trace
 
-The parser makes use of the cmdset to find command candidates. The
-parser return a list of matches. Each match is a tuple with its first
-three elements being the parsed cmdname (lower case), the remaining
-arguments, and the matched cmdobject from the cmdset.
+_CMD_IGNORE_PREFIXES = settings.CMD_IGNORE_PREFIXES
 
+# how many merged cmdsets to hold on to
+_MAX_MERGES = 500
+# merged cmdset: CmdTrie, least recently used first
+_MERGES = OrderedDict()
 
-This module is not accessed by default. To tell Evennia to use it
-instead of the default command parser, add the following line to
-your settings file:
 
-    COMMAND_PARSER = "server.conf.cmdparser.cmdparser"
+class CmdTrie:
+    """
+    The keys and aliases of every command in a cmdset, in two prefix tries:
+    one as they are, and one with the ignorable prefixes (like `@`) stripped.
+    """
 
-"""
+    def __init__(self, cmdset):
+        self.size = len(cmdset.commands)
+        self.keys = {}
+        self.noprefix_keys = {}
+        # commands with their own match method, which have to be asked
+        self.custom = []
+
+        for index, cmd in enumerate(cmdset):
+            if type(cmd).match is not Command.match:
+                self.custom.append((index, cmd))
+                continue
+            for key in cmd._keyaliases:
+                self._add(self.keys, key, (index, key, key, cmd))
+            for key, raw_key in cmd._noprefix_aliases.items():
+                self._add(self.noprefix_keys, key, (index, key, raw_key, cmd))
+
+    @staticmethod
+    def _add(trie, key, entry):
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        # None can't clash with a character, so it marks the end of a key
+        node.setdefault(None, []).append(entry)
+
+    def search(self, string, include_prefixes=True):
+        """
+        Find each command's longest key or alias that `string` starts with.
+
+        Returns:
+            list: `(cmdset index, key, raw key, command)` for each command
+                matching, in cmdset order.
+        """
+        node = self.keys if include_prefixes else self.noprefix_keys
+        found = [node[None]] if None in node else []
+        for char in string:
+            if (node := node.get(char)) is None:
+                break
+            if None in node:
+                found.append(node[None])
+
+        matched = {}
+        for entries in reversed(found):
+            for index, key, raw_key, cmd in entries:
+                if index in matched:
+                    continue
+                if cmd.arg_regex and not cmd.arg_regex.match(string[len(key) :]):
+                    continue
+                matched[index] = (index, key, raw_key, cmd)
+
+        for index, cmd in self.custom:
+            cmdname, raw_cmdname = cmd.match(string, include_prefixes=include_prefixes)
+            if cmdname:
+                matched[index] = (index, cmdname, raw_cmdname, cmd)
+
+        return [matched[index] for index in sorted(matched)]
+
+
+def get_trie(cmdset):
+    """
+    Get the trie for a merged cmdset, building it if needed.
+    """
+    trie = _MERGES.get(cmdset)
+    # a cmdset that's been added to since is built again
+    if trie is None or trie.size != len(cmdset.commands):
+        trie = _MERGES[cmdset] = CmdTrie(cmdset)
+        if len(_MERGES) > _MAX_MERGES:
+            _MERGES.popitem(last=False)
+    else:
+        _MERGES.move_to_end(cmdset)
+    return trie
+
+
+def build_matches(raw_string, cmdset, include_prefixes=False):
+    """
+    Match the start of `raw_string` against the cmdset's commands.
+
+    Returns:
+        list: Match tuples, as made by `create_match`.
+    """
+    matches = []
+    try:
+        if not include_prefixes and len(raw_string) > 1:
+            raw_string = raw_string.lstrip(_CMD_IGNORE_PREFIXES)
+        search_string = raw_string.lower()
+        for _, cmdname, raw_cmdname, cmd in get_trie(cmdset).search(
+            search_string, include_prefixes=include_prefixes
+        ):
+            matches.append(create_match(cmdname, raw_string, cmd, raw_cmdname))
+    except Exception:
+        log_trace("cmdhandler error. raw_input:%s" % raw_string)
+    return matches
 
 
 def cmdparser(raw_string, cmdset, caller, match_index=None):
@@ -44,7 +145,7 @@ def cmdparser(raw_string, cmdset, caller, match_index=None):
                   list of same-named command matches.
 
     Returns:
-     list of tuples: [(cmdname, args, cmdobj, cmdlen, mratio), ...]
+     list of tuples: [(cmdname, args, cmdobj, cmdlen, mratio, raw_cmdname), ...]
             where cmdname is the matching command name and args is
             everything not included in the cmdname. Cmdobj is the actual
             command instance taken from the cmdset, cmdlen is the length
@@ -52,4 +153,50 @@ def cmdparser(raw_string, cmdset, caller, match_index=None):
             (possibly) separate multiple matches.
 
     """
-    # Your implementation here
+    if not raw_string:
+        return []
+
+    # find matches, first using the full name
+    matches = build_matches(raw_string, cmdset, include_prefixes=True)
+
+    if not matches or len(matches) > 1:
+        # no single match, try parsing for optional numerical tags like 1-cmd
+        match_index, new_raw_string = try_num_differentiators(raw_string)
+        if match_index is not None:
+            matches.extend(build_matches(new_raw_string, cmdset, include_prefixes=True))
+
+    if not matches and _CMD_IGNORE_PREFIXES:
+        # still no match. Try to strip prefixes
+        raw_string = raw_string.lstrip(_CMD_IGNORE_PREFIXES) if len(raw_string) > 1 else raw_string
+        matches = build_matches(raw_string, cmdset, include_prefixes=False)
+
+    # only select command matches we are actually allowed to call.
+    matches = [match for match in matches if match[2].access(caller, "cmd")]
+
+    # try to bring the number of matches down to 1
+    if len(matches) > 1:
+        # analyze the match with preserved case, if it leaves at least one match
+        trimmed = [match for match in matches if raw_string.startswith(match[0])]
+        if trimmed:
+            matches = trimmed
+
+    if len(matches) > 1:
+        # only pick the matches with the longest command name
+        matches = sorted(matches, key=lambda m: m[3])
+        quality = [mat[3] for mat in matches]
+        matches = matches[-quality.count(quality[-1]) :]
+
+    if len(matches) > 1:
+        # then the highest ratio of command name to input
+        matches = sorted(matches, key=lambda m: m[4])
+        quality = [mat[4] for mat in matches]
+        matches = matches[-quality.count(quality[-1]) :]
+
+    if len(matches) > 1 and match_index is not None:
+        # couldn't tell them apart, but there's an index to pick one with
+        if 0 < match_index <= len(matches):
+            matches = [matches[match_index - 1]]
+        else:
+            matches = []
+
+    return matches
@@ -12,7 +12,246 @@ your services can be added to it). The function should not return
 anything. Plugin services are started last in the Portal startup
 process.
 
+Output compression lives here too. Telnet clients are offered MCCP by
+Evennia already; the telnet protocol below compresses at
+`MCCP_LEVEL` instead of zlib's slowest level, and both it and the
+websocket protocol measure how much they send before and after
+compression and how long compressing takes. The websocket factory is set
+to accept the permessage-deflate every browser offers. Totals are logged
+to the portal log every `REPORT_INTERVAL` seconds, and each session's on
+disconnect.
+
+The websocket protocol also keeps the html it converts the most common
+texts to, the connection screen first among them. (Telnet's ANSI parsing
+is cached by Evennia already.)
+
+The protocols are used through `TELNET_PROTOCOL_CLASS` and
+`WEBSOCKET_PROTOCOL_CLASS` in the settings.
 """
+import time
+import zlib
+from functools import lru_cache
+from twisted.application.service import Service
+from twisted.internet.task import LoopingCall
+from evennia.server.portal.telnet import TelnetProtocol as BaseTelnetProtocol
+from evennia.server.portal.webclient import WebSocketClient as BaseWebSocketClient
+from evennia.utils import logger
+from evennia.utils.text2html import parse_html
+
+# zlib level for MCCP; 9 costs several times the CPU of 6 for a few % less
+MCCP_LEVEL = 6
+# seconds between compression reports in the portal log
+REPORT_INTERVAL = 300
+# texts to keep the webclient's html for
+HTML_CACHE_SIZE = 512
+
+
+class CompressionStats:
+    """
+    Bytes before and after compression, and the time spent compressing them.
+    """
+
+    __slots__ = ("raw", "sent", "seconds", "sessions", "uncompressed")
+
+    def __init__(self):
+        self.raw = 0
+        self.sent = 0
+        self.seconds = 0.0
+        # only used for the totals
+        self.sessions = 0
+        self.uncompressed = 0
+
+    def add(self, raw, sent, seconds):
+        self.raw += raw
+        self.sent += sent
+        self.seconds += seconds
+
+    def __str__(self):
+        ratio = f"{self.sent / self.raw * 100:.0f}%" if self.raw else "-"
+        return (
+            f"{self.raw} bytes sent as {self.sent} ({ratio}),"
+            f" {self.seconds * 1000:.0f}ms compressing"
+        )
+
+
+# protocol: CompressionStats for every session since the portal started
+TOTALS = {"telnet": CompressionStats(), "websocket": CompressionStats()}
+
+
+class _MeteredCompressor:
+    """
+    Stands in for the zlib stream MCCP compresses with, counting what goes
+    through it.
+    """
+
+    def __init__(self, protocol):
+        self.protocol = protocol
+        self.stream = zlib.compressobj(MCCP_LEVEL)
+
+    def _count(self, raw, sent, start):
+        seconds = time.perf_counter() - start
+        self.protocol.compression.add(raw, sent, seconds)
+        TOTALS["telnet"].add(raw, sent, seconds)
+
+    def compress(self, data):
+        start = time.perf_counter()
+        out = self.stream.compress(data)
+        self._count(len(data), len(out), start)
+        return out
+
+    def flush(self, mode=zlib.Z_FINISH):
+        start = time.perf_counter()
+        out = self.stream.flush(mode)
+        self._count(0, len(out), start)
+        return out
+
+
+@lru_cache(maxsize=HTML_CACHE_SIZE)
+def _to_html(text, nocolor):
+    # the connection screen, room descriptions and the like go out over and
+    # over, so their html is only worked out once
+    return parse_html(text, strip_ansi=nocolor)
+
+
+def _log_session(protocol, name):
+    # telnet's disconnect() calls connectionLost itself, and twisted calls it
+    # again once the connection is closed
+    if getattr(protocol, "compression_logged", False):
+        return
+    protocol.compression_logged = True
+    totals = TOTALS[name]
+    totals.sessions += 1
+    if not (stats := protocol.compression).raw:
+        totals.uncompressed += 1
+        return
+    logger.log_info(f"Compression: {name} session {protocol.sessid} {stats}.")
+
+
+class TelnetProtocol(BaseTelnetProtocol):
+    """
+    Telnet, with MCCP compression metered.
+    """
+
+    def connectionMade(self):
+        self.compression = CompressionStats()
+        super().connectionMade()
+
+    # Evennia's MCCP sets, checks for and deletes `zlib` on the protocol to
+    # turn compression on and off, so a metered stream is swapped in for it
+    @property
+    def zlib(self):
+        try:
+            return self.__dict__["_compressor"]
+        except KeyError:
+            raise AttributeError("zlib")
+
+    @zlib.setter
+    def zlib(self, stream):
+        self.__dict__["_compressor"] = _MeteredCompressor(self)
+
+    @zlib.deleter
+    def zlib(self):
+        self.__dict__.pop("_compressor", None)
+
+    def connectionLost(self, reason):
+        _log_session(self, "telnet")
+        super().connectionLost(reason)
+
+
+class WebSocketClient(BaseWebSocketClient):
+    """
+    The webclient's websocket, with permessage-deflate metered.
+    """
+
+    # bytes written to the connection by the message being sent
+    _sending = None
+
+    def onOpen(self):
+        self.compression = CompressionStats()
+        super().onOpen()
+
+    def send_text(self, *args, **kwargs):
+        options = kwargs.get("options") or {}
+        flags = self.protocol_flags
+        if (
+            args
+            and isinstance(args[0], str)
+            and not options.get("raw", flags.get("RAW", False))
+            and not options.get("screenreader", flags.get("SCREENREADER", False))
+        ):
+            nocolor = options.get("nocolor", flags.get("NOCOLOR", False))
+            args = (_to_html(args[0], nocolor),) + args[1:]
+            # already html, so the client gets it as it is
+            kwargs["options"] = {**options, "raw": True, "client_raw": True}
+        super().send_text(*args, **kwargs)
+
+    def sendData(self, data, sync=False, chopsize=None):
+        if self._sending is not None:
+            self._sending += len(data)
+        return super().sendData(data, sync=sync, chopsize=chopsize)
+
+    def sendLine(self, line):
+        payload = line.encode()
+        self._sending = 0
+        start = time.perf_counter()
+        try:
+            return super().sendLine(line)
+        finally:
+            seconds = time.perf_counter() - start
+            self.compression.add(len(payload), self._sending, seconds)
+            TOTALS["websocket"].add(len(payload), self._sending, seconds)
+            self._sending = None
+
+    def onClose(self, wasClean, code=None, reason=None):
+        if hasattr(self, "compression"):
+            _log_session(self, "websocket")
+        super().onClose(wasClean, code=code, reason=reason)
+
+
+def _accept_deflate(offers):
+    # take the first permessage-deflate the browser offers
+    from autobahn.websocket.compress import (
+        PerMessageDeflateOffer,
+        PerMessageDeflateOfferAccept,
+    )
+
+    for offer in offers:
+        if isinstance(offer, PerMessageDeflateOffer):
+            return PerMessageDeflateOfferAccept(offer)
+    return None
+
+
+class CompressionReport(Service):
+    """
+    Logs the compression totals now and then.
+    """
+
+    name = "ParagonsCompressionReport"
+
+    def __init__(self):
+        self._report = LoopingCall(self.report)
+        self._last = None
+
+    def startService(self):
+        super().startService()
+        self._report.start(REPORT_INTERVAL, now=False)
+
+    def stopService(self):
+        if self._report.running:
+            self._report.stop()
+        self.report()
+        return super().stopService()
+
+    def report(self):
+        current = tuple((stats.raw, stats.sessions) for stats in TOTALS.values())
+        if current == self._last:
+            return
+        self._last = current
+        for name, stats in TOTALS.items():
+            logger.log_info(
+                f"Compression: {name} {stats}, {stats.sessions} sessions closed"
+                f" ({stats.uncompressed} uncompressed)."
+            )
 
 
 def start_plugin_services(portal):
@@ -21,4 +260,9 @@ def start_plugin_services(portal):
 
     portal - a reference to the main portal application.
     """
-    pass
+    for service in portal.services:
+        if service.name and service.name.startswith("EvenniaWebSocket"):
+            # TCPServer(port, factory, ...)
+            service.args[1].setProtocolOptions(perMessageCompressionAccept=_accept_deflate)
+
+    portal.services.addService(CompressionReport())
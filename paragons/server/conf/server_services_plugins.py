@@ -21,4 +21,12 @@ def start_plugin_services(server):
 
     server - a reference to the main server application.
     """
-    pass
+    from world.lag import LAG_MONITOR
+    from world.offload import OFFLOAD
+    from world.profiler import PROFILER
+
+    server.services.addService(LAG_MONITOR)
+    # pools for run_offloaded, started when first used
+    server.services.addService(OFFLOAD)
+    # idle until it's switched on with the profile command
+    server.services.addService(PROFILER)
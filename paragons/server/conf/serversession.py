@@ -21,8 +21,31 @@ settings file:
 
 """
 
+from django.conf import settings
+from twisted.internet import reactor
 from evennia.server.serversession import ServerSession as BaseServerSession
 
+from world.cmdstats import count_message
+
+# seconds to hold plain text back for, so it goes out with whatever follows
+_BATCH_WINDOW = getattr(settings, "OUTPUT_BATCH_WINDOW", 0.005)
+
+
+def _split_text(text):
+    """
+    Returns:
+        tuple: (text, options) if `text` is something that can be merged
+            with other text, otherwise (None, None).
+    """
+    if isinstance(text, str):
+        return text, {}
+    if isinstance(text, (tuple, list)):
+        if len(text) == 1 and isinstance(text[0], str):
+            return text[0], {}
+        if len(text) == 2 and isinstance(text[0], str) and isinstance(text[1], dict):
+            return text[0], text[1]
+    return None, None
+
 
 class ServerSession(BaseServerSession):
     """
@@ -34,4 +57,57 @@ class ServerSession(BaseServerSession):
     through their session(s).
     """
 
-    pass
+    # text waiting to go out, as [text options, [lines]], and the call that sends it
+    _outbuf = None
+    _flush_call = None
+
+    def data_out(self, **kwargs):
+        """
+        Plain text is held back for a few milliseconds and merged with
+        whatever text follows, so a burst of messages (a combat round, a room
+        on arrival) goes to the Portal as one message instead of many.
+        Anything else - prompts, OOB data, messages with options - goes out
+        right away, taking any held text with it.
+        """
+        # counted for the per-command stats
+        count_message()
+
+        if _BATCH_WINDOW and len(kwargs) == 1 and "text" in kwargs:
+            text, options = _split_text(kwargs["text"])
+            if text is not None:
+                if self._outbuf and self._outbuf[-1][0] == options:
+                    self._outbuf[-1][1].append(text)
+                else:
+                    self._outbuf = (self._outbuf or []) + [[options, [text]]]
+                if not self._flush_call:
+                    self._flush_call = reactor.callLater(_BATCH_WINDOW, self.flush_output)
+                return
+
+        if self._outbuf and "text" not in kwargs and "options" not in kwargs:
+            # the last of the held text can share the frame
+            options, lines = self._outbuf.pop()
+            self.flush_output()
+            text = "\n".join(lines)
+            kwargs["text"] = (text, options) if options else text
+        else:
+            self.flush_output()
+        super().data_out(**kwargs)
+
+    def flush_output(self):
+        """
+        Send any text being held back.
+        """
+        if self._flush_call:
+            if self._flush_call.active():
+                self._flush_call.cancel()
+            self._flush_call = None
+        if not (outbuf := self._outbuf):
+            return
+        self._outbuf = None
+        for options, lines in outbuf:
+            text = "\n".join(lines)
+            super().data_out(text=(text, options) if options else text)
+
+    def at_disconnect(self, reason=None):
+        self.flush_output()
+        super().at_disconnect(reason=reason)
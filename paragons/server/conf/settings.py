@@ -34,6 +34,50 @@ from evennia.settings_default import *
 # This is the name of your game. Make it catchy!
 SERVERNAME = "paragons"
 
+# Match commands through a prefix trie of each merged cmdset
+COMMAND_PARSER = "server.conf.cmdparser.cmdparser"
+
+# Counts outgoing messages for the command stats, and batches them
+SERVER_SESSION_CLASS = "server.conf.serversession.ServerSession"
+# Seconds plain text is held back to be sent along with the next message,
+# 0 to send everything right away
+OUTPUT_BATCH_WINDOW = 0.005
+
+# Metered MCCP and websocket compression, see server/conf/portal_services_plugins.py
+TELNET_PROTOCOL_CLASS = "server.conf.portal_services_plugins.TelnetProtocol"
+WEBSOCKET_PROTOCOL_CLASS = "server.conf.portal_services_plugins.WebSocketClient"
+
+
+######################################################################
+# Crafting
+######################################################################
+
+CRAFT_RECIPE_MODULES = [
+    "world.recipes.smithing",
+    "world.recipes.carving",
+    "world.recipes.leathercraft",
+]
+
+
+######################################################################
+# Global Scripts
+######################################################################
+
+GLOBAL_SCRIPTS = {
+    "crafting": {
+        "typeclass": "typeclasses.scripts.CraftingScript",
+        "repeats": -1,
+        "interval": 1,
+        "desc": "Processes queued crafting jobs",
+    },
+    "regrowth": {
+        "typeclass": "typeclasses.scripts.RegrowthScript",
+        "repeats": -1,
+        "interval": 30,
+        "desc": "Regrows depleted gather nodes",
+    },
+}
+
 
 ######################################################################
 # Settings given in secret_settings.py override those in this file.
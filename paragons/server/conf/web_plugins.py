@@ -38,4 +38,11 @@ def at_webproxy_root_creation(web_root):
             primarily for new protocol development, but suitable
             for other shenanigans.
     """
+    from twisted.web.resource import EncodingResourceWrapper
+    from twisted.web.server import GzipEncoderFactory
+
+    # gzip the AJAX webclient's responses, for browsers without websockets
+    # (the websocket is compressed in portal_services_plugins.py)
+    if ajax := web_root.children.get(b"webclientdata"):
+        web_root.putChild(b"webclientdata", EncodingResourceWrapper(ajax, [GzipEncoderFactory()]))
     return web_root
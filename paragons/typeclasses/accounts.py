@@ -24,6 +24,65 @@ several more options for customizing the Guest account system.
 
 from evennia.accounts.accounts import DefaultAccount, DefaultGuest
 from evennia.contrib.rpg.character_creator.character_creator import ContribChargenAccount
+from evennia.utils import lazy_property
+
+from world import logins
+
+
+class AccountSettings:
+    """
+    An account's settings, read from its `settings` attribute once and then
+    kept in memory, so checking one is just reading a slot. Changing one
+    saves them all straight away.
+    """
+
+    # setting: (key in the attribute, default); the default's type is the
+    # setting's type, and is what missing settings count as
+    OPTIONS = {
+        "auto_attack": ("auto attack", False),
+        "auto_prompt": ("auto prompt", False),
+    }
+    # what new accounts start with instead
+    NEW_ACCOUNT = {
+        "auto_attack": True,
+    }
+
+    __slots__ = ("account", *OPTIONS)
+
+    def __init__(self, account):
+        object.__setattr__(self, "account", account)
+        saved = account.attributes.get("settings") or {}
+        for name, (key, default) in self.OPTIONS.items():
+            object.__setattr__(self, name, type(default)(saved.get(key, default)))
+
+    def __setattr__(self, name, value):
+        if name not in self.OPTIONS:
+            raise AttributeError(f"'{name}' isn't a setting.")
+        object.__setattr__(self, name, type(self.OPTIONS[name][1])(value))
+        self.save()
+
+    def all(self):
+        """
+        Returns:
+            list: (setting name as players see it, value) for every setting.
+        """
+        return [(key, getattr(self, name)) for name, (key, _) in self.OPTIONS.items()]
+
+    def find(self, key):
+        """
+        Returns:
+            str or None: The setting a player-facing name (like `auto attack`) is for.
+        """
+        key = key.strip().lower().replace("_", " ")
+        for name, (option_key, _) in self.OPTIONS.items():
+            if option_key == key:
+                return name
+        return None
+
+    def save(self):
+        self.account.attributes.add(
+            "settings", {key: getattr(self, name) for name, (key, _) in self.OPTIONS.items()}
+        )
 
 
 class Account(ContribChargenAccount):
@@ -93,12 +152,28 @@ class Account(ContribChargenAccount):
 
     """
 
+    @lazy_property
+    def settings(self):
+        return AccountSettings(self)
+
+    def puppet_object(self, session, obj):
+        # timed for the login stats, until the end of obj.at_post_puppet
+        logins.start(obj, "puppet")
+        super().puppet_object(session, obj)
+
+    def at_post_login(self, session=None, **kwargs):
+        # loaded now, so no command has to
+        self.settings
+        super().at_post_login(session=session, **kwargs)
+        if session:
+            # started by the connect command
+            logins.finish(session, "login")
+
     def at_account_creation(self):
         super().at_account_creation()
-        self.db.settings = {
-            'auto attack': True,
-            'auto prompt': False
-        }
+        for name, value in AccountSettings.NEW_ACCOUNT.items():
+            setattr(self.settings, name, value)
+        self.settings.save()
 
 
 class Guest(DefaultGuest):
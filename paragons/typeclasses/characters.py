@@ -7,17 +7,21 @@ is setup to be the "default" character type created by the default
 creation commands.
 
 """
+import time
+from collections import namedtuple
 from random import randint 
 from string import punctuation 
 from evennia import AttributeProperty 
-from evennia.utils import lazy_property, iter_to_str, delay, logger
-from evennia.prototypes.spawner import spawn
+from evennia.utils import lazy_property, iter_to_str, delay, logger, percent
 from evennia.contrib.rpg.traits import TraitHandler 
 from evennia.contrib.game_systems.clothing.clothing import ClothedCharacter, get_worn_clothes
-from evennia.contrib.game_systems.cooldowns import CooldownHandler
 from evennia.objects.objects import DefaultCharacter
 
-from .objects import ObjectParent
+from world import logins
+from world.cooldowns import CooldownHandler
+from world.spawning import spawn
+
+from .objects import ObjectParent, CarrierParent
 
 _IMMOBILE = (
     "sitting",
@@ -25,9 +29,223 @@ _IMMOBILE = (
     "unconscious",
 )
 _MAX_CAPACITY = 10
+# the least time between vitals updates to one session, in seconds
+_VITALS_INTERVAL = 0.5
+_GAUGES = ("hp", "ep", "fp")
+
+
+class Gauge(namedtuple("Gauge", ("current", "min", "max", "rate"))):
+    def percent(self, formatting="{:3.1f}%"):
+        return percent(self.current, self.min, self.max, formatting=formatting)
+
+
+def _read_gauge(trait):
+    # the trait works out its own regen when current is read
+    return Gauge(trait.current, trait.min, trait.max, trait.rate)
+
+
+class WieldHandler:
+    """
+    Keeps what's wielded in which hand in memory, along with which hands each
+    weapon is in, so checking a character's weapons doesn't read and
+    deserialize the `_wielded` attribute. Changes are written through to it.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        # hand: weapon, or None if it's free
+        self._slots = dict(obj.attributes.get("_wielded", {}))
+        # weapon: [hands]
+        self._hands = {}
+        self._index()
+
+    def _index(self):
+        self._hands = {}
+        for hand, weapon in self._slots.items():
+            if weapon:
+                self._hands.setdefault(weapon, []).append(hand)
+
+    def _held(self, weapon):
+        return weapon.pk and weapon.location == self.obj
+
+    def _prune(self):
+        # weapons deleted or moved off without being unwielded; deleted ones
+        # can't be hashed, so the slots are rebuilt rather than looked up
+        if all(self._held(weapon) for weapon in self._hands):
+            return
+        self._slots = {
+            hand: weapon if weapon and self._held(weapon) else None
+            for hand, weapon in self._slots.items()
+        }
+        self._index()
+        self._save()
+
+    @property
+    def weapons(self):
+        self._prune()
+        return list(self._hands)
+
+    @property
+    def free(self):
+        self._prune()
+        return [hand for hand, weapon in self._slots.items() if not weapon]
+
+    def get(self, hand):
+        self._prune()
+        return self._slots.get(hand)
+
+    def has(self, weapon):
+        self._prune()
+        return bool(weapon.pk) and weapon in self._hands
+
+    def hands(self, weapon):
+        if not self.has(weapon):
+            return []
+        return list(self._hands[weapon])
+
+    def add(self, weapon, hands):
+        for hand in hands:
+            self._slots[hand] = weapon
+        self._hands.setdefault(weapon, []).extend(hands)
+        self._save()
+
+    def remove(self, weapon):
+        """
+        Returns:
+            list: The hands freed up.
+        """
+        if not self.has(weapon):
+            return []
+        hands = self._hands.pop(weapon)
+        for hand in hands:
+            self._slots[hand] = None
+        self._save()
+        return hands
+
+    def reset(self, hands):
+        self._slots = dict.fromkeys(hands)
+        self._hands = {}
+        self._save()
+
+    def _save(self):
+        self.obj.db._wielded = self._slots
+
+
+class VitalsHandler:
+    """
+    Sends a character's vitals - hp/ep/fp, status flags and cooldowns - to
+    their sessions. Sessions with OOB (GMCP, MSDP or the webclient) get them
+    as `Char.Vitals` data with only what changed since the last send, and
+    clients draw their own prompt from that. Other sessions get the text
+    prompt, but only when something changed.
+
+    Updates to a session are sent at most once every `_VITALS_INTERVAL`;
+    anything more in that window is sent together when it's up.
+    """
 
+    def __init__(self, obj):
+        self.obj = obj
+        # session id: the vitals last sent to it
+        self._sent = {}
+        # session id: when it was last sent anything
+        self._last_send = {}
+        # session id: whether a text prompt is owed when the wait is up
+        self._pending = {}
+        self._snapshot = None
+
+    def snapshot(self):
+        """
+        Read all of the character's gauges in one go. The result is kept
+        until whatever is running now - a command, a combat tick - is done, or
+        `changed` is called, so anything reading vitals in the meantime
+        doesn't have the traits redo their regen.
+
+        Returns:
+            dict: Gauge key: `Gauge(current, min, max, rate)`
+        """
+        if self._snapshot is None:
+            traits = self.obj.traits
+            self._snapshot = {key: _read_gauge(traits.get(key)) for key in _GAUGES}
+            delay(0, self.changed)
+        return self._snapshot
+
+    def changed(self):
+        """
+        Drop the current snapshot. Call this after changing any gauge.
+        """
+        self._snapshot = None
+
+    def get(self):
+        """
+        Returns:
+            dict: The current vitals, with gauges as `[current, max]` and
+                cooldowns as the time they're ready.
+        """
+        obj = self.obj
+        vitals = {
+            key: [int(gauge.current), int(gauge.max)] for key, gauge in self.snapshot().items()
+        }
+        vitals["status"] = sorted(obj.tags.get(category="status", return_list=True))
+        vitals["cooldowns"] = {key: int(ready) for key, ready in obj.cooldowns.ready_times().items()}
+        return vitals
+
+    def update(self, prompt=False):
+        """
+        Send any changed vitals to the character's sessions.
+
+        Args:
+            prompt (bool): Send text-only sessions the prompt even if they
+                don't have `auto prompt` turned on.
+        """
+        if not prompt and (account := self.obj.account):
+            prompt = account.settings.auto_prompt
+
+        now = time.monotonic()
+        vitals = None
+        for session in self.obj.sessions.all():
+            sessid = session.sessid
+            if not session.protocol_flags.get("OOB") and not prompt:
+                continue
+            if sessid in self._pending:
+                self._pending[sessid] |= prompt
+                continue
+            if (wait := self._last_send.get(sessid, 0) + _VITALS_INTERVAL - now) > 0:
+                self._pending[sessid] = prompt
+                delay(wait, self._flush, sessid)
+                continue
+            if vitals is None:
+                vitals = self.get()
+            self._send(session, vitals, now)
+
+    def _flush(self, sessid):
+        prompt = self._pending.pop(sessid, False)
+        for session in self.obj.sessions.all():
+            if session.sessid == sessid and (prompt or session.protocol_flags.get("OOB")):
+                self._send(session, self.get(), time.monotonic())
+
+    def _send(self, session, vitals, now):
+        sessid = session.sessid
+        last = self._sent.get(sessid, {})
+        if session.protocol_flags.get("OOB"):
+            if changed := {key: val for key, val in vitals.items() if last.get(key) != val}:
+                self.obj.msg(Char_Vitals=changed, session=session)
+            else:
+                return
+        elif vitals != last:
+            self.obj.msg(prompt=self.obj.get_display_status(self.obj), session=session)
+        else:
+            return
+        self._sent[sessid] = vitals
+        self._last_send[sessid] = now
+
+    def reset(self):
+        """
+        Forget what's been sent, so the next update sends everything.
+        """
+        self._sent.clear()
 
-class Character(ObjectParent, ClothedCharacter):
+
+class Character(CarrierParent, ObjectParent, ClothedCharacter):
     """
     The Character defaults to reimplementing some of base Object's hook methods with the
     following functionality:
@@ -64,7 +282,7 @@ class Character(ObjectParent, ClothedCharacter):
         if not (evade := self.use_skill("evasion")):
             evade = self.db.agi 
         
-        if (randint(0, 99) - self.traits.fp.value) < evade:
+        if (randint(0, 99) - self.vitals.snapshot()["fp"].current) < evade:
             return True 
         else:
             self.msg("You can't find an oppurtunity to escape.")
@@ -78,15 +296,21 @@ class Character(ObjectParent, ClothedCharacter):
     def cooldowns(self):
         return CooldownHandler(self, db_attribute="cooldowns")
 
+    @lazy_property
+    def vitals(self):
+        return VitalsHandler(self)
+
+    @lazy_property
+    def wielded(self):
+        return WieldHandler(self)
+
     @property
     def wielding(self):
-        return [obj for obj in self.attributes.get('_wielded',{}).values() if obj]
+        return self.wielded.weapons
 
     @property
     def free_hands(self):
-        return [
-            key for key, val in self.attributes.get('_wielded', {}).items() if not val
-        ]
+        return self.wielded.free
     
     def defense(self, damage_type=None):
         # if damage_type is not None:
@@ -156,24 +380,37 @@ class Character(ObjectParent, ClothedCharacter):
     def at_post_move(self, source_location, **kwargs):
         super().at_post_move(source_location, **kwargs)
 
-        if self.account and (settings := self.account.db.settings):
-            if settings.get('auto prompt'):
-                status = self.get_display_status(self)
-                self.msg(prompt=status)
+        self.vitals.update()
+
+    def at_post_puppet(self, **kwargs):
+        super().at_post_puppet(**kwargs)
+        # a new session needs the full set of vitals
+        self.vitals.reset()
+        self.vitals.update()
+
+        # started in Account.puppet_object, see world/logins.py
+        logins.finish(self, "puppet")
+        # only the first character a connection puppets counts
+        for session in self.sessions.all():
+            if not session.ndb.prompted:
+                session.ndb.prompted = True
+                logins.record("connect to prompt", logins.since_connect(session))
             
     def at_damage(self, attacker, damage, damage_type=None):
         damage -= self.defense(damage_type)
         self.traits.hp.current -= max(damage, 0)
+        self.vitals.changed()
         self.msg(f"You take {damage} damage {f'as |w{damage_type}|n' if damage_type else ''} from |r{attacker.get_display_name(self)}|n!")
         attacker.msg(f"You deal {damage} damage {f'as |w{damage_type}|n' if damage_type else ''} from |r{self.get_display_name(attacker)}|n.")
 
-        if self.traits.hp.value <= 0:
+        if self.vitals.snapshot()["hp"].current <= 0:
             self.tags.add('unconscious', category="status")
             self.tags.add('lying down', category='status')
             self.msg(
                 "You fall unconscious. You can |wrespawn|n or wait to be |wrevived|n."
             )
             self.traits.hp.rate = 0 
+            self.vitals.changed()
             if self.in_combat:
                 combat = self.location.scripts.get('combat')[0]
                 combat.remove_combatant(self)
@@ -190,11 +427,8 @@ class Character(ObjectParent, ClothedCharacter):
         self.location.msg_contents(text=message, from_obj=self, mapping=mapping)
 
     def at_wield(self, weapon, **kwargs):
-        wielded = self.attributes.get("_wielded", {})
-        if wielded:
-            wielded.deserialize()
-
-        free = self.free_hands
+        wielded = self.wielded
+        free = wielded.free
 
         if hand := kwargs.get('hand'):
             if hand not in free:
@@ -212,12 +446,10 @@ class Character(ObjectParent, ClothedCharacter):
         if weapon.tags.has('two_handed', category='wielded'):
             if len(free) < 2:
                 self.msg(
-                    f"You need two free hands to wield {weap.get_display_name(self)}."
+                    f"You need two free hands to wield {weapon.get_display_name(self)}."
                 )
                 return 
             hands = free[:2]
-            for hand in hands:
-                wielded[hand] = weapon
         else:
             if main_hand := self.db.handedness:
                 hand = main_hand if main_hand in free else free[0]
@@ -225,28 +457,15 @@ class Character(ObjectParent, ClothedCharacter):
                 hand = free[0]
 
             hands = [hand]
-            wielded[hand] = weapon 
-        self.db._wielded = wielded 
+        wielded.add(weapon, hands)
         return hands 
 
     def at_unwield(self, weapon, **kwargs):
-        wielded = self.attributes.get("_wielded", {})
-        if wielded:
-            wielded.deserialize()
-        
-        if weapon not in wielded.values():
+        if not self.wielded.has(weapon):
             self.msg("You are not wielding that.")
             return 
         
-        freed = []
-        for hand, weap in wielded.items():
-            if weap == weapon:
-                wielded[hand] = None 
-                freed.append(hand)
-        
-        self.db._wielded = wielded
-
-        return freed 
+        return self.wielded.remove(weapon)
 
     def use_skill(self, skill_name, *args, **kwargs):
         if not skill_name:
@@ -266,8 +485,9 @@ class Character(ObjectParent, ClothedCharacter):
         if looker != self:
             chunks.append(self.get_display_name(looker, **kwargs))
         
+        vitals = self.vitals.snapshot()
         chunks.append(
-            f"Health {self.traits.hp.percent()} : Energy {self.traits.ep.percent()} : Focus {self.traits.fp.percent()}"
+            f"Health {vitals['hp'].percent()} : Energy {vitals['ep'].percent()} : Focus {vitals['fp'].percent()}"
         )
 
         if status_tags := self.tags.get(category='status', return_list=True):
@@ -286,6 +506,10 @@ class Character(ObjectParent, ClothedCharacter):
 
             return ' - '.join(chunks)
 
+    # whether this should hear about characters arriving and leaving; see
+    # ListenerHandler in typeclasses/rooms.py
+    reacts_to_movement = False
+
     def at_character_arrive(self, char, **kwargs):
         pass
 
@@ -297,9 +521,10 @@ class Character(ObjectParent, ClothedCharacter):
             self.tags.remove('unconscious')
             self.tags.remove('lying down')
 
-            self.traits.hp.current = self.traits.hp.current.max // 5
-            self.msg(prompt=self.get_display_status(self))
+            self.traits.hp.current = self.traits.hp.max // 5
             self.traits.hp.rate = 0.1
+            self.vitals.changed()
+            self.vitals.update(prompt=True)
 
 
 
@@ -307,10 +532,7 @@ class PlayerCharacter(Character):
     def at_object_creation(self):
         super().at_object_creation()
 
-        self.db._wielded = {
-            'left': None,
-            'right': None
-        }
+        self.wielded.reset(('left', 'right'))
     
     def get_display_name(self, looker, **kwargs):
         name = super().get_display_name(looker)
@@ -319,7 +541,7 @@ class PlayerCharacter(Character):
         return f"|g{name}|n"
 
     def at_pre_object_receive(self, object, source_loc, **kwargs):
-        if len([obj for obj in self.contents if not obj.db.worn]) > _MAX_CAPACITY:
+        if self.carried.count > _MAX_CAPACITY:
             self.msg("You can't carry anymore.")
             source_loc.msg(f"{self.get_display_name(source_loc)} can't carry any more.")
             return False
@@ -327,9 +549,7 @@ class PlayerCharacter(Character):
 
     def at_damage(self, attacker, damage, damage_type=None):
         super().at_damage(attacker, damage, damage_type=damage_type)
-        if self.traits.hp.value < 50:
-            status = self.get_display_status(self)
-            self.msg(prompt=status)
+        self.vitals.update(prompt=self.vitals.snapshot()["hp"].current < 50)
         
     def attack(self, target, weapon, **kwargs):
         if not self.in_combat:
@@ -357,11 +577,10 @@ class PlayerCharacter(Character):
 
         weapon.at_attack(self, target)
 
-        status = self.get_display_status(self)
-        self.msg(prompt=status)
+        self.vitals.update(prompt=True)
 
-        if self.account and (settings := self.account.db.settings):
-            if settings.get('auto attack') and (speed := weapon.speed):
+        if (account := self.account) and account.settings.auto_attack:
+            if speed := weapon.speed:
                 delay(speed + 1, self.attack, None, weapon, persistent=True)
 
     def respawn(self):
@@ -369,8 +588,9 @@ class PlayerCharacter(Character):
         self.tags.remove("lying down", category="status")
         self.traits.hp.reset()
         self.traits.hp.rate = 0.1
+        self.vitals.changed()
         self.move_to(self.home)
-        self.msg(prompt=self.get_display_status(self))
+        self.vitals.update(prompt=True)
 
 
 class NPC(Character):
@@ -386,6 +606,10 @@ class NPC(Character):
     def get_display_name(self, looker, **kwargs):
         name = super().get_display_name(looker, **kwargs)
         return f"|{self.name_color}{name}|n"
+
+    @property
+    def reacts_to_movement(self):
+        return 'aggressive' in self.attributes.get('react_as', "") or bool(self.db.following)
     
     def at_character_arrive(self, char, **kwargs):
         if 'aggressive' in self.attributes.get('react_as', ""):
@@ -403,8 +627,9 @@ class NPC(Character):
         
     def at_damage(self, attacker, damage, damage_type=None):
         super().at_damage(attacker, damage, damage_type=damage_type)
+        hp = self.vitals.snapshot()["hp"].current
 
-        if self.traits.hp.value <= 0:
+        if hp <= 0:
             if combat := self.location.scripts.get("combat"):
                 combat = combat[0]
                 if not combat.remove_combatant(self):
@@ -434,7 +659,7 @@ class NPC(Character):
             return 
 
         threshold = self.attributes.get("flee_at", 25)
-        if self.traits.hp.value <= threshold:
+        if hp <= threshold:
             self.execute_cmd("flee")
 
         if not self.db.combat_target:
@@ -492,7 +717,7 @@ class NPC(Character):
             return 
         if not (weapon := self.db.natural_weapon):
             return
-        if self.traits.ep.value < weapon.get('energy_cost', 5):
+        if self.vitals.snapshot()["ep"].current < weapon.get('energy_cost', 5):
             return False 
         
         if not wielder.cooldowns.ready('attack'):
@@ -510,6 +735,7 @@ class NPC(Character):
         damage = damage * result 
 
         self.traits.ep.current -= weapon.get('energy_cost', 5)
+        self.vitals.changed()
         if not damage:
             self.at_emote(
                 f"$conj(swings) $pron(your) {weapon.get('name')} at $you(target), but $conj(misses).",
@@ -3,7 +3,7 @@ from evennia import AttributeProperty
 from evennia.utils import logger 
 from evennia.contrib.game_systems.containers import ContribContainer 
 
-from .objects import Object, ClothingObject 
+from .objects import Object, ClothingObject, CarrierParent
 
 
 class BareHand:
@@ -14,7 +14,7 @@ class BareHand:
     speed = 5
 
     def at_pre_attack(self, wielder, **kwargs):
-        if wielder.traits.ep.value < self.energy_cost:
+        if wielder.vitals.snapshot()["ep"].current < self.energy_cost:
             wielder.msg("You are too exhausted to hit anything.")
             return False 
         if not wielder.cooldowns.ready('attack'):
@@ -26,6 +26,7 @@ class BareHand:
     def at_attack(self, wielder, target, **kwargs):
         damage = self.damage
         wielder.traits.ep.current -= self.energy_cost 
+        wielder.vitals.changed()
         if not damage:
             wielder.at_emote(
                 f"$conj(swings) $pron(your) {self.name} at $you(target), but $conj(misses).",
@@ -45,13 +46,13 @@ class MeleeWeapon(Object):
     speed = AttributeProperty(10)
 
     def at_pre_attack(self, wielder, **kwargs):
-        if wielder.traits.ep.value < self.attributes.get("energy_cost", 0):
+        if wielder.vitals.snapshot()["ep"].current < self.attributes.get("energy_cost", 0):
             wielder.msg("You are too exhausted to use this.")
             return False 
         if not wielder.cooldowns.ready('attack'):
             wielder.msg("You can't attack aggain yet.")
             return False 
-        if self not in wielder.wielding:
+        if not wielder.wielded.has(self):
             wielder.msg(
                 f"You must be wielding your {self.get_display_name(wielder)} to attack with it."
             )
@@ -71,6 +72,7 @@ class MeleeWeapon(Object):
             damage = damage * result 
 
         wielder.traits.ep.current -= self.attributes.get('energy_cost', 0)
+        wielder.vitals.changed()
         if not damage:
             wielder.at_emote(
                 "$conj(swings) {weapon} at $you(target), but $conj(misses).",
@@ -92,6 +94,11 @@ class MeleeWeapon(Object):
         wielder.cooldowns.add('attack', self.speed)
         
 
-class WearableContainer(ContainerObject, ClothingObject):
-    pass
+class WearableContainer(CarrierParent, ContribContainer, ClothingObject):
+    def at_pre_put_in(self, putter, target, **kwargs):
+        if self.carried.count >= self.capacity:
+            singular, _ = self.get_numbered_name(1, putter)
+            putter.msg(f"You can't fit anything else in {singular}.")
+            return False
+        return True
 
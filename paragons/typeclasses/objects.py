@@ -11,11 +11,18 @@ inheritance.
 
 """
 from random import randint 
-from evennia.prototypes import spawner, prototypes
+from evennia import AttributeProperty, GLOBAL_SCRIPTS
+from evennia.prototypes import prototypes
+from evennia.utils import lazy_property, delay
 from evennia.objects.objects import DefaultObject
 from evennia.contrib.game_systems.clothing import ContribClothing 
 
 from commands.interact import GatherCmdSet
+from world.cooldowns import forget_cooldowns
+from world.spawning import spawn
+
+# seconds between yields when gathering everything from a node
+_GATHER_INTERVAL = 3
 
 
 class ObjectParent:
@@ -29,6 +36,88 @@ class ObjectParent:
 
     """
 
+    def at_object_delete(self):
+        # deleting doesn't go through the leave hooks, so tell our holder directly
+        if (location := self.location) and (carried := getattr(location, "carried", None)):
+            carried.remove(self)
+        forget_cooldowns(self)
+        return super().at_object_delete()
+
+
+class CarryHandler:
+    """
+    Keeps a running tally of the objects carried - but not worn - by an
+    object, so capacity checks don't need to look at every item's attributes.
+
+    The tally is only held in memory. It's built from the contents the first
+    time it's needed and kept up to date by the receive/leave and wear/remove
+    hooks after that.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self._carried = None
+        self._weight = 0
+
+    def _load(self):
+        if self._carried is None:
+            self._carried = {
+                item.id: item.attributes.get("weight", 1)
+                for item in self.obj.contents
+                if not item.db.worn
+            }
+            self._weight = sum(self._carried.values())
+        return self._carried
+
+    @property
+    def count(self):
+        return len(self._load())
+
+    @property
+    def weight(self):
+        self._load()
+        return self._weight
+
+    def add(self, item):
+        # an unloaded tally will pick the item up from contents when it's built
+        if self._carried is None or item.id in self._carried:
+            return
+        if item.location != self.obj or item.db.worn:
+            return
+        weight = item.attributes.get("weight", 1)
+        self._carried[item.id] = weight
+        self._weight += weight
+
+    def remove(self, item):
+        if self._carried is None:
+            return
+        if (weight := self._carried.pop(item.id, None)) is not None:
+            self._weight -= weight
+
+    def reset(self):
+        self._carried = None
+        self._weight = 0
+
+
+class CarrierParent:
+    """
+    Mixin for anything that carries objects around, like characters and bags.
+    Any code moving things in or out by setting `location` directly instead
+    of using `move_to` needs to call `carried.add`/`carried.remove` itself.
+    """
+
+    @lazy_property
+    def carried(self):
+        return CarryHandler(self)
+
+    def at_object_receive(self, moved_obj, source_location, move_type="move", **kwargs):
+        super().at_object_receive(moved_obj, source_location, move_type=move_type, **kwargs)
+        self.carried.add(moved_obj)
+
+    def at_object_leave(self, moved_obj, target_location, move_type="move", **kwargs):
+        super().at_object_leave(moved_obj, target_location, move_type=move_type, **kwargs)
+        self.carried.remove(moved_obj)
+
 
 class Object(ObjectParent, DefaultObject):
     """
@@ -177,16 +266,34 @@ class Object(ObjectParent, DefaultObject):
     """
 
     def at_drop(self, dropper, **kwargs):
-        if self in dropper.wielding:
+        if (wielded := getattr(dropper, "wielded", None)) and wielded.has(self):
             dropper.unwield(self)
         super().at_drop(dropper, **kwargs)
 
 
 class ClothingObject(ObjectParent, ContribClothing):
-    pass
+    def wear(self, wearer, wearstyle, quiet=False):
+        super().wear(wearer, wearstyle, quiet=quiet)
+        wearer.carried.remove(self)
+
+    def remove(self, wearer, quiet=False):
+        super().remove(wearer, quiet=quiet)
+        wearer.carried.add(self)
+
+    def at_get(self, getter, **kwargs):
+        super().at_get(getter, **kwargs)
+        getter.carried.add(self)
 
 
 class GatherNode(Object):
+    """
+    A resource that can be gathered from. Once it runs out it goes dormant -
+    hidden, and without the gather command - until the regrowth script brings
+    it back `regrow_time` seconds later.
+    """
+
+    regrow_time = AttributeProperty(900)
+
     def at_object_creation(self):
         self.locks.add("get:false()")
         self.cmdset.add_default(GatherCmdSet)
@@ -194,6 +301,13 @@ class GatherNode(Object):
     def get_display_footer(self, looker, **kwargs):
         return "You can |wgather|n from this."
 
+    @property
+    def remaining(self):
+        # kept in memory while being gathered from, and saved when people stop
+        if self.ndb.gathers is None:
+            self.ndb.gathers = self.db.gathers or 0
+        return self.ndb.gathers
+
     def at_gather(self, char, **kwargs):
         if not (proto_key := self.db.spawn_proto):
             char.msg(
@@ -201,21 +315,107 @@ class GatherNode(Object):
             )
             self.delete()
             return 
-        if not (remaining := self.db.gathers):
+        if not (remaining := self.remaining):
             char.msg("There is none left.")
-            self.delete()
+            self.deplete()
             return 
 
         amt = randint(1, min(remaining, 3))
 
-        objs = spawner.spawn(*[proto_key] * amt)
+        objs = spawn(*[proto_key] * amt)
         for obj in objs:
             obj.location = char 
+            char.carried.add(obj)
         
         if amt == remaining:
             char.msg(f"You collect the last {obj.get_numbered_name(amt, char)[1]}.")
-            self.delete()
+            self.deplete()
         else:
             char.msg(f"You collect {obj.get_numbered_name(amt, char)[1]}.")
-            self.db.gathers -= amt 
-            
\ No newline at end of file
+            self.ndb.gathers = self.db.gathers = remaining - amt
+
+    def start_gathering(self, char):
+        """
+        Keep gathering from this node until it runs out or `char` stops,
+        handing over everything collected in one go at the end.
+        """
+        if char.ndb.gathering:
+            char.msg("You are already gathering.")
+            return
+        if not self.db.spawn_proto or not self.remaining:
+            self.at_gather(char)
+            return
+
+        char.ndb.gathering = {"node": self, "amount": 0}
+        if self.ndb.gatherers is None:
+            self.ndb.gatherers = set()
+        self.ndb.gatherers.add(char)
+        char.msg(f"You start gathering from {self.get_display_name(char)}.")
+        delay(_GATHER_INTERVAL, self.gather_tick, char)
+
+    def gather_tick(self, char):
+        if not (state := char.ndb.gathering) or state["node"] != self:
+            return
+        if char.location != self.location or not self.remaining:
+            self.stop_gathering(char)
+            return
+
+        amt = randint(1, min(self.remaining, 3))
+        state["amount"] += amt
+        self.ndb.gathers -= amt
+
+        if self.remaining:
+            delay(_GATHER_INTERVAL, self.gather_tick, char)
+        else:
+            self.stop_gathering(char)
+
+    def stop_gathering(self, char):
+        if not (state := char.ndb.gathering) or state["node"] != self:
+            return
+        del char.ndb.gathering
+        if self.ndb.gatherers:
+            self.ndb.gatherers.discard(char)
+
+        if amount := state["amount"]:
+            objs = spawn(*[self.db.spawn_proto] * amount)
+            for obj in objs:
+                obj.location = char
+                char.carried.add(obj)
+            char.msg(f"You stop gathering, having collected {obj.get_numbered_name(amount, char)[1]}.")
+        else:
+            char.msg("You stop gathering.")
+
+        if self.remaining:
+            self.db.gathers = self.remaining
+        elif not self.db.dormant:
+            self.deplete()
+
+    def stop_all_gathering(self):
+        for char in list(self.ndb.gatherers or []):
+            self.stop_gathering(char)
+
+    def at_server_reload(self):
+        # hand over anything still being gathered, it only exists in memory
+        self.stop_all_gathering()
+        super().at_server_reload()
+
+    def at_server_shutdown(self):
+        self.stop_all_gathering()
+        super().at_server_shutdown()
+
+    def deplete(self):
+        self.ndb.gathers = self.db.gathers = 0
+        self.db.dormant = True
+        self.locks.add("view:perm(Builder)")
+        self.cmdset.remove_default()
+        GLOBAL_SCRIPTS.regrowth.schedule(self, self.regrow_time)
+
+    def regrow(self):
+        gathers = None
+        if proto_key := self.tags.get(category=prototypes.PROTOTYPE_TAG_CATEGORY):
+            if protos := prototypes.search_prototype(proto_key, no_db=True):
+                gathers = prototypes.init_spawn_value(protos[0].get("gathers"))
+        self.ndb.gathers = self.db.gathers = gathers or randint(1, 3)
+        del self.db.dormant
+        self.locks.add("view:all()")
+        self.cmdset.add_default(GatherCmdSet)
@@ -5,8 +5,10 @@ Rooms are simple containers that has no location of their own.
 
 """
 
+from django.db.models.signals import post_save, post_delete
 from evennia.objects.objects import DefaultRoom
-from evennia.utils import create, iter_to_str, logger 
+from evennia.typeclasses.attributes import Attribute
+from evennia.utils import create, iter_to_str, logger, lazy_property
 from evennia.contrib.grid.xyzgrid.xyzroom import XYZRoom
 from evennia.contrib.grid.wilderness.wilderness import WildernessRoom
 
@@ -16,12 +18,95 @@ from .scripts import RestockScript
 from commands.shops import ShopCmdSet
 from commands.skills import TrainCmdSet
 
+# attributes that decide whether a character reacts to movement
+_REACTIVE_ATTRIBUTES = ("following", "react_as")
+# goes up whenever one of them changes anywhere, so every room works out its
+# listeners again the next time it needs them
+_LISTENER_VERSION = [0]
+
+
+def _perm_class(looker):
+    """
+    Sum up everything about the looker that command locks check.
+    """
+    account = getattr(looker, "account", None)
+    if looker.is_superuser or (account and account.is_superuser):
+        return "superuser"
+    perms = set(looker.permissions.all())
+    if account:
+        perms.update(account.permissions.all())
+    return tuple(sorted(perms))
+
+
+class ListenerHandler:
+    """
+    Keeps track of the objects in a room that react to characters arriving
+    or leaving - anything with a true `reacts_to_movement` - so a move only
+    calls the hooks on those, rather than on every character in the room.
+
+    Like the carry tally, it's held in memory, built from the contents when
+    first needed and kept up to date by the room's receive/leave hooks.
+    Anything placed by setting `location` directly needs to be added with
+    `add`. Changing an attribute that `reacts_to_movement` depends on (see
+    `_REACTIVE_ATTRIBUTES`) makes it rebuild.
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self._listeners = None
+        self._version = None
+
+    def _load(self):
+        if self._listeners is None or self._version != _LISTENER_VERSION[0]:
+            self._version = _LISTENER_VERSION[0]
+            self._listeners = {
+                obj: None
+                for obj in self.obj.contents_get(content_type='character')
+                if getattr(obj, 'reacts_to_movement', False)
+            }
+        return self._listeners
+
+    def all(self):
+        # anything moved out without going through the hooks is dropped here
+        listeners = self._load()
+        for obj in [obj for obj in listeners if obj.location != self.obj]:
+            del listeners[obj]
+        return list(listeners)
+
+    def add(self, obj):
+        if self._listeners is None or self._version != _LISTENER_VERSION[0]:
+            # built with it on next use
+            return
+        if getattr(obj, 'reacts_to_movement', False):
+            self._listeners[obj] = None
+
+    def remove(self, obj):
+        if self._listeners is not None:
+            self._listeners.pop(obj, None)
+
+    def reset(self):
+        self._listeners = None
+
+
+def _reactivity_changed(sender, instance, **kwargs):
+    if instance.db_key in _REACTIVE_ATTRIBUTES:
+        _LISTENER_VERSION[0] += 1
+
+
+post_save.connect(_reactivity_changed, sender=Attribute, dispatch_uid="paragons_room_listeners")
+post_delete.connect(_reactivity_changed, sender=Attribute, dispatch_uid="paragons_room_listeners")
+
 
 class RoomParent(ObjectParent):
+    @lazy_property
+    def listeners(self):
+        return ListenerHandler(self)
+
     def at_object_receive(self, mover, source_loc, move_type=None, **kwargs):
         super().at_object_receive(mover, source_loc, **kwargs)
         if 'character' in mover._content_types:
-            for obj in self.contents_get(content_type='character'):
+            self.listeners.add(mover)
+            for obj in self.listeners.all():
                 if obj == mover:
                     continue 
                 obj.at_character_arrive(mover, **kwargs)
@@ -32,22 +117,30 @@ class RoomParent(ObjectParent):
             combat = combat[0]
             combat.remove_combatant(mover)
         if 'character' in mover._content_types:
-            for obj in self.contents_get(content_type='character'):
-                if obj == mover:
-                    continue 
-                obj.at_character_depart(mover, destination, **kwrargs)
+            self.listeners.remove(mover)
+            for obj in self.listeners.all():
+                obj.at_character_depart(mover, destination, **kwargs)
 
     def get_display_footer(self, looker, **kwargs):
-        cmd_keys = [
-            f"|w{cmd.key}|n"
-            for cmdet in self.cmdset.all()
-            for cmd in cmdset
-            if cmd.access(looker, 'cmd')
-        ]
-        if cmd_keys:
-            return f"Area commands available: {', '.join(cmd_keys)}"
-        else:
-            return ""
+        # the footer only changes with the room's cmdsets and the looker's
+        # permissions, so it's worked out once for each of those
+        cmdsets = self.cmdset.all()
+        version = tuple((cmdset.path, cmdset.key) for cmdset in cmdsets)
+        footers = self.ndb.footers
+        if not footers or footers["version"] != version:
+            footers = self.ndb.footers = {"version": version}
+
+        perm_class = _perm_class(looker)
+        if (footer := footers.get(perm_class)) is None:
+            cmd_keys = [
+                f"|w{cmd.key}|n"
+                for cmdset in cmdsets
+                for cmd in cmdset
+                if cmd.access(looker, 'cmd')
+            ]
+            footer = f"Area commands available: {', '.join(cmd_keys)}" if cmd_keys else ""
+            footers[perm_class] = footer
+        return footer
 
 
 
@@ -71,6 +164,11 @@ class OverworldRoom(RoomParent, WildernessRoom):
             self.ndb.minimap = self.db.minimap
         return self.ndb.minimap or ""
 
+    def set_active_coordinates(self, new_coordinates, obj):
+        super().set_active_coordinates(new_coordinates, obj)
+        # the room's being reused somewhere else
+        self.listeners.reset()
+
     def at_server_reload(self, **kwargs):
         self.db.desc = self.ndb.active_desc 
         self.db.minimap = self.ndb.minimap 
@@ -11,11 +11,16 @@ Rather, each script tends to inherit from the base Script class and
 just overloads its hooks to have it perform its function.
 
 """
+import heapq
+import time
+from collections import deque
 from random import randint, choice
+from django.db import transaction
 from evennia.utils import make_iter, logger 
 from evennia.scripts.scripts import DefaultScript
 from evennia.prototypes.prototypes import PROTOTYPE_TAG_CATEGORY
-from evennia.prototypes.spawner import spawn
+
+from world.spawning import spawn
 
 class Script(DefaultScript):
     """
@@ -247,4 +252,155 @@ class RestockScript(Script):
                 for obj in objs:
                     obj.db.value = obj.db.value or 1 
                     self.obj.add_stock(obj)
-                    
\ No newline at end of file
+
+
+class CraftingScript(Script):
+    """
+    Global script working through everyone's crafting queues. Each tick
+    advances every queued job, then does all the crafting that finished in
+    one transaction.
+
+    Queues are kept in memory and only saved when a job is added, finished
+    or dropped (and on reload/shutdown).
+    """
+
+    # most crafting batches run in a single tick; the rest wait for the next
+    max_per_tick = 50
+
+    def at_script_creation(self):
+        self.key = "crafting"
+        self.desc = "Processes queued crafting jobs"
+        self.interval = 1
+        self.persistent = True
+        self.db.queues = []
+
+    @property
+    def queues(self):
+        if self.ndb.queues is None:
+            self.ndb.queues = {
+                crafter: deque(list(job) for job in jobs)
+                for crafter, jobs in (self.db.queues or [])
+                if crafter
+            }
+        return self.ndb.queues
+
+    def save_queues(self):
+        self.db.queues = [
+            [crafter, list(jobs)] for crafter, jobs in self.queues.items() if jobs
+        ]
+
+    def add_job(self, crafter, recipe, count=1):
+        """
+        Queue up `count` of a recipe for a crafter.
+
+        Args:
+            crafter (Object): Who is crafting.
+            recipe (SkillRecipe): The recipe class to craft.
+            count (int): How many to make.
+        """
+        # job: [recipe name, how many are left, seconds until the next one is done]
+        self.queues.setdefault(crafter, deque()).append([recipe.name, count, recipe.craft_time])
+        self.save_queues()
+
+    def get_jobs(self, crafter):
+        return list(self.queues.get(crafter, ()))
+
+    def clear_jobs(self, crafter):
+        if self.queues.pop(crafter, None):
+            self.save_queues()
+
+    def at_repeat(self):
+        from world.recipes.registry import get_recipe
+
+        if not (queues := self.queues):
+            return
+
+        # first work out what finished this tick, without touching the database
+        finished = []
+        for crafter, jobs in list(queues.items()):
+            if not crafter.pk or not jobs:
+                del queues[crafter]
+                continue
+            job = jobs[0]
+            name, remaining, time_left = job
+            if not (recipe := get_recipe(name)):
+                jobs.popleft()
+                continue
+            time_left -= self.interval
+            done = 0
+            while time_left <= 0 and done < remaining:
+                done += 1
+                time_left += recipe.craft_time
+            job[1], job[2] = remaining - done, time_left
+            if done:
+                finished.append((crafter, recipe, done))
+
+        if not finished:
+            return
+
+        # then craft it all in one go
+        with transaction.atomic():
+            for crafter, recipe, done in finished[: self.max_per_tick]:
+                jobs = queues[crafter]
+                if recipe.craft_batch(crafter, done) is None:
+                    crafter.msg(f"You stop making {recipe.name}.")
+                    jobs.popleft()
+                elif not jobs[0][1]:
+                    jobs.popleft()
+                    if not jobs:
+                        crafter.msg("You finish your crafting.")
+        # anything over budget is finished first thing next tick
+        for crafter, recipe, done in finished[self.max_per_tick :]:
+            job = queues[crafter][0]
+            job[1] += done
+            job[2] -= recipe.craft_time * done
+
+        self.save_queues()
+
+    def at_server_reload(self):
+        self.save_queues()
+
+    def at_server_shutdown(self):
+        self.save_queues()
+
+
+class RegrowthScript(Script):
+    """
+    Global script bringing depleted gather nodes back once their regrowth
+    time is up, so nodes get reused rather than deleted and spawned again.
+    """
+
+    def at_script_creation(self):
+        self.key = "regrowth"
+        self.desc = "Regrows depleted gather nodes"
+        self.interval = 30
+        self.persistent = True
+        self.db.schedule = []
+
+    @property
+    def schedule_heap(self):
+        # heap of (regrow at, node id, node)
+        if self.ndb.schedule is None:
+            heap = [(due, node.id, node) for node, due in (self.db.schedule or []) if node]
+            heapq.heapify(heap)
+            self.ndb.schedule = heap
+        return self.ndb.schedule
+
+    def save_schedule(self):
+        self.db.schedule = [[node, due] for due, _, node in self.schedule_heap]
+
+    def schedule(self, node, delay):
+        heapq.heappush(self.schedule_heap, (time.time() + delay, node.id, node))
+        self.save_schedule()
+
+    def at_repeat(self):
+        heap = self.schedule_heap
+        now = time.time()
+        if not heap or heap[0][0] > now:
+            return
+
+        while heap and heap[0][0] <= now:
+            _, _, node = heapq.heappop(heap)
+            if node.pk:
+                node.regrow()
+        self.save_schedule()
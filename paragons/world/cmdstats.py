@@ -0,0 +1,226 @@
+"""
+Command stats
+
+Timings for every command built on `commands.command.Command`: how long its
+parse, func and at_post_cmd took, and how many database queries and outgoing
+session messages each run caused, aggregated per command key into latency
+histograms.
+
+Only the synchronous part of a command is timed - the time a `yield`ing
+command spends waiting isn't counted against it. Query and message counts
+include anything the command caused, like other commands it runs.
+
+`cmdstats` shows them in-game, and `export_stats` writes them to a text file
+in the log directory, which is also done when the server stops.
+"""
+import os
+import time
+from bisect import bisect_left
+from functools import wraps
+from django.conf import settings
+from django.db import connection
+from evennia.utils.evtable import EvTable
+
+# upper bounds of the histogram buckets, in milliseconds, plus one for the rest
+BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+PHASES = ("parse", "func", "at_post_cmd")
+EXPORT_FILE = os.path.join(settings.LOG_DIR, "cmdstats.txt")
+
+# running totals, which each command takes the difference of
+_COUNTS = {"queries": 0, "messages": 0}
+# command key: CommandStats
+_STATS = {}
+# when the stats were last reset
+_SINCE = [time.time()]
+
+
+def _count_query(execute, sql, params, many, context):
+    _COUNTS["queries"] += 1
+    return execute(sql, params, many, context)
+
+
+def count_message():
+    """
+    Count a message going out to a session. Called by the server session.
+    """
+    _COUNTS["messages"] += 1
+
+
+class CommandStats:
+    """
+    Everything recorded for one command key.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.count = 0
+        self.errors = 0
+        # seconds, summed over every run
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.queries = 0
+        self.max_queries = 0
+        self.messages = 0
+
+    def add(self, timing, queries, messages, error=False):
+        elapsed = sum(timing.values())
+        self.count += 1
+        self.errors += error
+        for phase, seconds in timing.items():
+            self.phases[phase] += seconds
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.histogram[bisect_left(BUCKETS, elapsed * 1000)] += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.messages += messages
+
+    def mean(self, value):
+        return value / self.count if self.count else 0
+
+    def percentile(self, pct):
+        """
+        The bucket a percentile of runs falls in, as its upper bound in ms.
+        """
+        wanted = self.count * pct / 100
+        seen = 0
+        for bound, count in zip(BUCKETS, self.histogram):
+            seen += count
+            if seen >= wanted:
+                return f"{bound:g}"
+        return f">{BUCKETS[-1]:g}"
+
+
+class CommandTiming:
+    """
+    The numbers for one run of a command, added to its stats once it's done.
+    """
+
+    __slots__ = ("key", "phases", "queries", "messages", "current")
+
+    def __init__(self, key):
+        if _count_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_count_query)
+        self.key = key
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.queries = _COUNTS["queries"]
+        self.messages = _COUNTS["messages"]
+        # the phase being timed, if any
+        self.current = None
+
+    def finish(self, error=False):
+        # nothing gets timed again after this
+        self.current = "done"
+        if not (stats := _STATS.get(self.key)):
+            stats = _STATS[self.key] = CommandStats(self.key)
+        stats.add(
+            self.phases,
+            _COUNTS["queries"] - self.queries,
+            _COUNTS["messages"] - self.messages,
+            error=error,
+        )
+
+
+def timed(phase, method):
+    """
+    Wrap a command method so it's timed as one of `PHASES`. Finishing
+    at_post_cmd (or any phase raising an error) records the run.
+    """
+
+    @wraps(method)
+    def wrapper(cmd, *args, **kwargs):
+        if (timing := cmd._timing) is None:
+            timing = cmd._timing = CommandTiming(cmd.key)
+        elif timing.current:
+            # a super() call, or a run that's already been recorded
+            return method(cmd, *args, **kwargs)
+
+        timing.current = phase
+        start = time.perf_counter()
+        try:
+            ret = method(cmd, *args, **kwargs)
+        except Exception:
+            timing.phases[phase] += time.perf_counter() - start
+            timing.finish(error=True)
+            raise
+        timing.phases[phase] += time.perf_counter() - start
+        if phase == "at_post_cmd":
+            timing.finish()
+        else:
+            timing.current = None
+        return ret
+
+    wrapper.timed = True
+    return wrapper
+
+
+def reset_stats():
+    _STATS.clear()
+    _SINCE[0] = time.time()
+
+
+def get_stats(sort="total"):
+    """
+    Returns:
+        list: CommandStats, with the most time taken (or the most of `sort`) first.
+    """
+    return sorted(_STATS.values(), key=lambda stats: getattr(stats, sort), reverse=True)
+
+
+def stats_table(sort="total", limit=None):
+    """
+    The stats as an EvTable, one row per command. Times are in ms.
+    """
+    table = EvTable(
+        "command", "runs", "err", "mean", "parse", "func", "post", "p50", "p95", "p99",
+        "max", "queries", "max q", "msgs",
+        border="header",
+    )
+    for stats in get_stats(sort)[:limit]:
+        table.add_row(
+            stats.key,
+            stats.count,
+            stats.errors,
+            f"{stats.mean(stats.total) * 1000:.2f}",
+            *(f"{stats.mean(stats.phases[phase]) * 1000:.2f}" for phase in PHASES),
+            stats.percentile(50),
+            stats.percentile(95),
+            stats.percentile(99),
+            f"{stats.max * 1000:.1f}",
+            f"{stats.mean(stats.queries):.1f}",
+            stats.max_queries,
+            f"{stats.mean(stats.messages):.1f}",
+        )
+    return table
+
+
+def histogram_table(key):
+    """
+    The latency histogram for one command as an EvTable, or None if it hasn't run.
+    """
+    if not (stats := _STATS.get(key)):
+        return None
+    table = EvTable("ms", "runs", "%", border="header")
+    bounds = [f"<= {bound:g}" for bound in BUCKETS] + [f"> {BUCKETS[-1]:g}"]
+    for bound, count in zip(bounds, stats.histogram):
+        table.add_row(bound, count, f"{count / stats.count * 100:.1f}")
+    return table
+
+
+def export_stats(filename=EXPORT_FILE):
+    """
+    Write all the stats, with every command's histogram, to a text file.
+
+    Returns:
+        str: The file written.
+    """
+    since = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(_SINCE[0]))
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    lines = [f"Command stats from {since} to {now}. Times are in ms.", "", str(stats_table())]
+    for stats in get_stats():
+        lines.extend(("", f"{stats.key} ({stats.count} runs)", str(histogram_table(stats.key))))
+    with open(filename, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return filename
@@ -0,0 +1,164 @@
+"""
+Cooldowns
+
+Cooldowns kept in one process-wide table, keyed by object id and cooldown
+key, with expiry times on the monotonic clock. Starting or checking a
+cooldown never touches the database; an object's cooldowns are only saved
+to its attribute when one of them is long enough to matter over a restart,
+or when the server stops (see `server/conf/at_server_startstop.py`).
+
+The saved attribute is in the same format as the cooldowns contrib uses, so
+`CooldownHandler` here is a drop-in for that one.
+"""
+import math
+import time
+
+# cooldowns at least this long, in seconds, are saved as soon as they're set
+_SAVE_AFTER = 60
+
+# object id: {cooldown key: time.monotonic() when it's ready}
+_COOLDOWNS = {}
+# object id: handler, for everything with changes that haven't been saved
+_UNSAVED = {}
+
+
+def save_cooldowns():
+    """
+    Save every object's cooldowns that have changed since they were last saved.
+    """
+    for handler in list(_UNSAVED.values()):
+        handler.save()
+
+
+def forget_cooldowns(obj):
+    """
+    Drop an object's cooldowns from the table without saving them, for when
+    it's being deleted.
+    """
+    _COOLDOWNS.pop(obj.id, None)
+    _UNSAVED.pop(obj.id, None)
+
+
+class CooldownHandler:
+    """
+    Tracks cooldowns for an object, using the shared table.
+
+    Args:
+        obj (Object): The object the cooldowns belong to.
+        db_attribute (str): The attribute to save them in.
+    """
+
+    def __init__(self, obj, db_attribute="cooldowns"):
+        self.obj = obj
+        self.db_attribute = db_attribute
+        # the table outlives the handler, which is made again if the object
+        # drops out of the cache
+        if (data := _COOLDOWNS.get(obj.id)) is None:
+            data = _COOLDOWNS[obj.id] = self._load()
+        self.data = data
+
+    def _load(self):
+        # saved as wall-clock times, so they need moving onto the monotonic clock
+        now = time.time()
+        offset = time.monotonic() - now
+        return {
+            key: ready + offset
+            for key, ready in (self.obj.attributes.get(self.db_attribute) or {}).items()
+            if ready > now
+        }
+
+    def _left(self, key, now):
+        if (ready := self.data.get(key)) is None:
+            return 0
+        if ready <= now:
+            del self.data[key]
+            return 0
+        return ready - now
+
+    @property
+    def all(self):
+        """
+        Returns a list of the keys of all active cooldowns.
+        """
+        self.cleanup()
+        return list(self.data)
+
+    def ready(self, *args):
+        """
+        Whether all the given cooldowns are ready. Missing ones count as ready.
+        """
+        now = time.monotonic()
+        return not any(self._left(key, now) for key in args)
+
+    def time_left(self, *args, use_int=False):
+        """
+        The most time left on any of the given cooldowns, in seconds.
+        """
+        now = time.monotonic()
+        left = max((self._left(key, now) for key in args), default=0)
+        return math.ceil(left) if use_int else left
+
+    def ready_times(self):
+        """
+        Returns:
+            dict: Cooldown key: the wall-clock time it's ready, for all active cooldowns.
+        """
+        self.cleanup()
+        offset = time.time() - time.monotonic()
+        return {key: ready + offset for key, ready in self.data.items()}
+
+    def add(self, cooldown, seconds):
+        """
+        Start a cooldown, replacing it if it's already running.
+        """
+        seconds = max(seconds or 0, 0)
+        self.data[cooldown] = time.monotonic() + seconds
+        self._changed(seconds)
+
+    set = add
+
+    def extend(self, cooldown, seconds):
+        """
+        Add time to a cooldown, starting it if it isn't running.
+
+        Returns:
+            float: The time left on it now.
+        """
+        left = self.time_left(cooldown) + seconds
+        self.add(cooldown, left)
+        return max(left, 0)
+
+    def reset(self, cooldown):
+        """
+        End a cooldown early.
+        """
+        if self.data.pop(cooldown, None) is not None:
+            self._changed()
+
+    def clear(self):
+        """
+        End all cooldowns.
+        """
+        self.data.clear()
+        self._changed()
+
+    def cleanup(self):
+        """
+        Drop expired cooldowns.
+        """
+        now = time.monotonic()
+        for key in [key for key, ready in self.data.items() if ready <= now]:
+            del self.data[key]
+
+    def _changed(self, seconds=0):
+        if seconds >= _SAVE_AFTER:
+            self.save()
+        else:
+            _UNSAVED[self.obj.id] = self
+
+    def save(self):
+        """
+        Save the active cooldowns to the object's attribute.
+        """
+        _UNSAVED.pop(self.obj.id, None)
+        self.obj.attributes.add(self.db_attribute, self.ready_times())
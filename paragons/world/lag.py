@@ -0,0 +1,141 @@
+"""
+Lag
+
+Watches how late the reactor is. Everything in the game - commands,
+`delay()` calls like auto attacks, scripts ticking - runs one at a time on
+the reactor, so anything slow holds all of it up.
+
+A heartbeat is scheduled on the reactor every `INTERVAL` seconds, and how
+late it runs is the lag. A watchdog thread notices when the heartbeat is
+more than `STALL_THRESHOLD` late while it's still happening, and takes the
+reactor's stack at that moment, so each stall is recorded with the command
+or script that was running.
+
+`LAG_MONITOR` is added to the server's services in
+`server/conf/server_services_plugins.py`, and the `lag` command shows what
+it's seen.
+"""
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+from django.conf import settings
+from twisted.application.service import Service
+from twisted.internet.task import LoopingCall
+from evennia.commands.command import Command
+from evennia.scripts.scripts import DefaultScript
+from evennia.utils import logger
+
+from world.profiler import frame_name
+
+# seconds between heartbeats
+INTERVAL = 0.1
+# seconds late before it counts as a stall
+STALL_THRESHOLD = 0.25
+# heartbeats to work the percentiles out from, about five minutes' worth
+WINDOW = 3000
+# stalls to remember
+MAX_STALLS = 50
+
+Stall = namedtuple("Stall", ("when", "lag", "running", "where", "stack"))
+
+
+def _describe(frame):
+    """
+    Work out what the reactor is running from its stack.
+
+    Returns:
+        tuple: (the command or script running, if any, the innermost
+            frame in the game's own code, if any, the whole stack)
+    """
+    running = where = None
+    stack = []
+    while frame:
+        code = frame.f_code
+        stack.append(frame_name(code))
+        if where is None and code.co_filename.startswith(settings.GAME_DIR):
+            where = stack[-1]
+        if running is None:
+            obj = frame.f_locals.get("self")
+            if isinstance(obj, Command):
+                running = f"command '{obj.key}'"
+            elif isinstance(obj, DefaultScript):
+                running = f"script '{obj.key}' ({code.co_name})"
+        frame = frame.f_back
+    stack.reverse()
+    return running, where, stack
+
+
+class LagMonitor(Service):
+    """
+    Measures reactor lag with a heartbeat, and catches stalls with a watchdog thread.
+    """
+
+    name = "ParagonsLagMonitor"
+
+    def __init__(self):
+        self.thread_id = threading.main_thread().ident
+        self.lags = deque(maxlen=WINDOW)
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self.last_beat = time.monotonic()
+        self._heartbeat = LoopingCall(self.beat)
+        self._stop = threading.Event()
+        self._thread = None
+        # the beat the watchdog last caught being late, and what it saw
+        self._caught = None
+        self._capture = None
+
+    def startService(self):
+        super().startService()
+        self.last_beat = time.monotonic()
+        self._heartbeat.start(INTERVAL, now=False)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="lag watchdog", daemon=True)
+        self._thread.start()
+
+    def stopService(self):
+        if self._heartbeat.running:
+            self._heartbeat.stop()
+        self._stop.set()
+        return super().stopService()
+
+    def beat(self):
+        now = time.monotonic()
+        previous, self.last_beat = self.last_beat, now
+        lag = max(now - previous - INTERVAL, 0)
+        self.lags.append(lag)
+        if lag < STALL_THRESHOLD:
+            return
+
+        running, where, stack = self._capture if self._caught == previous else (None, None, [])
+        stall = Stall(time.time() - lag, lag, running, where, stack)
+        self.stalls.append(stall)
+        logger.log_warn(
+            f"Reactor stalled for {lag * 1000:.0f}ms"
+            f" running {running or 'unknown'} at {where or 'unknown'}."
+        )
+
+    def _watch(self):
+        check = STALL_THRESHOLD / 2
+        while not self._stop.wait(check):
+            beat = self.last_beat
+            if beat == self._caught or time.monotonic() - beat - INTERVAL < STALL_THRESHOLD:
+                continue
+            if frame := sys._current_frames().get(self.thread_id):
+                self._capture = _describe(frame)
+                self._caught = beat
+
+    def percentiles(self, *pcts):
+        """
+        Lag percentiles over the recent heartbeats.
+
+        Returns:
+            list: The lag in seconds for each percentile asked for.
+        """
+        if not self.lags:
+            return [0] * len(pcts)
+        lags = sorted(self.lags)
+        return [lags[min(int(len(lags) * pct / 100), len(lags) - 1)] for pct in pcts]
+
+
+LAG_MONITOR = LagMonitor()
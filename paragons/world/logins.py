@@ -0,0 +1,70 @@
+"""
+Logins
+
+How long the server takes to get people into the game, measured on every
+real login:
+
+- `login`: from the server receiving the `connect` command to the end of
+  `at_post_login`.
+- `puppet`: from the puppet request (`ic`, or the automatic one at login)
+  to the end of `at_post_puppet`, including `at_pre_puppet` putting the
+  character back where it logged out.
+- `connect to prompt`: from the connection opening to the end of the first
+  `at_post_puppet`, where the first prompt and vitals go out. This one
+  includes the player typing their password and anything they do before
+  going in character, so it's only a rough guide to what players see.
+
+The first two are the server's own work, and what to watch while it gets
+through a reconnect storm after a restart. The `logins` command shows the
+percentiles.
+"""
+import time
+from collections import deque
+
+STAGES = ("login", "puppet", "connect to prompt")
+# logins to keep
+WINDOW = 1000
+
+# stage: the most recent timings, in seconds
+_TIMES = {stage: deque(maxlen=WINDOW) for stage in STAGES}
+
+
+def record(stage, seconds):
+    _TIMES[stage].append(seconds)
+
+
+def start(obj, stage):
+    """
+    Note the start of a stage, on the session or character it's for.
+    """
+    obj.ndb.login_timing = obj.ndb.login_timing or {}
+    obj.ndb.login_timing[stage] = time.perf_counter()
+
+
+def finish(obj, stage):
+    """
+    Record a stage started on `obj` with `start`, if it was.
+    """
+    if (timing := obj.ndb.login_timing) and (started := timing.pop(stage, None)) is not None:
+        record(stage, time.perf_counter() - started)
+
+
+def since_connect(session):
+    """
+    Seconds since the session's connection was opened.
+    """
+    return time.time() - session.conn_time
+
+
+def count(stage):
+    return len(_TIMES[stage])
+
+
+def percentiles(stage, *pcts):
+    """
+    Returns:
+        list: The timing in seconds for each percentile asked for.
+    """
+    if not (times := sorted(_TIMES[stage])):
+        return [0] * len(pcts)
+    return [times[min(int(len(times) * pct / 100), len(times) - 1)] for pct in pcts]
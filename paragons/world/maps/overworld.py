@@ -49,10 +49,11 @@ MAP_KEY = {
 
 from random import randint, choices
 from evennia.contrib.grid.wilderness import wilderness 
-from evennia.prototypes import spawner 
 from evennia.utils.search import search_tag 
 from evennia.utils import logger, pad
 
+from world.spawning import spawn
+
 
 class OverworldMapProvider(wilderness.WildernessMapProvider):
     room_typeclass = "typeclasses.rooms.OverworldRoom"
@@ -142,12 +143,15 @@ class OverworldMapProvider(wilderness.WildernessMapProvider):
         protkey = choices(options, weights=weights)[0]
 
         try:
-            obj = spawner.spawn(protkey)[0]
+            obj = spawn(protkey)[0]
         except KeyError as e:
             logger.log_msg(f"   {e} on {protkey}")
             return
         
         room.wilderness.move_obj(obj, coordinates)
+        # the wilderness places things directly, skipping the receive hook
+        if listeners := getattr(obj.location, "listeners", None):
+            listeners.add(obj)
         if tag and tag_cat:
             obj.tags.add(tag, category=tag_cat)
 
@@ -0,0 +1,156 @@
+"""
+Offload
+
+Runs slow, self-contained work off the reactor so it doesn't hold up
+everyone else, with the result handed back on the reactor through a
+Deferred:
+
+    run_offloaded(render_table, rows).addCallback(caller.msg)
+
+By default the work goes to a small pool of threads, which suits anything
+waiting on files or the network, or built from plain data (rendering a big
+EvTable from rows gathered beforehand). `cpu=True` sends it to a pool of
+processes instead, for long pure-Python number crunching the GIL would
+otherwise keep on the reactor's time. Those get the function and arguments
+pickled, so the function has to be importable at module level, and nothing
+it changes comes back except what it returns.
+
+Neither pool may touch the database, typeclassed objects or anything else
+the reactor is using - gather what's needed first and pass it in.
+
+`OFFLOAD` is added to the server's services in
+`server/conf/server_services_plugins.py`, which shuts the pools down with
+the server. The `lag` command shows how busy they are.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from twisted.application.service import Service
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+from twisted.internet.threads import deferToThreadPool
+from twisted.python.threadpool import ThreadPool
+
+MAX_THREADS = 4
+MAX_PROCESSES = 2
+
+
+def _timed_call(fn, submitted, args, kwargs):
+    # runs in the worker, so the wait and run times come back with the result
+    started = time.monotonic()
+    result = fn(*args, **kwargs)
+    return result, started - submitted, time.monotonic() - started
+
+
+class PoolStats:
+    """
+    Counts for one pool.
+    """
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+        self.submitted = 0
+        self.done = 0
+        self.failed = 0
+        # queued or running
+        self.pending = 0
+        self.max_pending = 0
+        # seconds, summed over everything done
+        self.waited = 0.0
+        self.ran = 0.0
+
+    def add(self):
+        self.submitted += 1
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+
+    def finish(self, result):
+        self.pending -= 1
+        result, waited, ran = result
+        self.done += 1
+        self.waited += waited
+        self.ran += ran
+        return result
+
+    def fail(self, failure):
+        self.pending -= 1
+        self.failed += 1
+        return failure
+
+
+class Offload(Service):
+    """
+    Owns the thread and process pools, starting them when first needed.
+    """
+
+    name = "ParagonsOffload"
+
+    def __init__(self):
+        self._threads = None
+        self._processes = None
+        self.stats = {
+            "threads": PoolStats("threads", MAX_THREADS),
+            "processes": PoolStats("processes", MAX_PROCESSES),
+        }
+
+    @property
+    def threads(self):
+        if not self._threads:
+            self._threads = ThreadPool(minthreads=0, maxthreads=MAX_THREADS, name="offload")
+            self._threads.start()
+        return self._threads
+
+    @property
+    def processes(self):
+        if not self._processes:
+            self._processes = ProcessPoolExecutor(max_workers=MAX_PROCESSES)
+        return self._processes
+
+    def run(self, fn, *args, cpu=False, **kwargs):
+        stats = self.stats["processes" if cpu else "threads"]
+        stats.add()
+        submitted = time.monotonic()
+        if cpu:
+            deferred = Deferred()
+            future = self.processes.submit(_timed_call, fn, submitted, args, kwargs)
+            future.add_done_callback(lambda future: reactor.callFromThread(_handoff, future, deferred))
+        else:
+            deferred = deferToThreadPool(
+                reactor, self.threads, _timed_call, fn, submitted, args, kwargs
+            )
+        deferred.addCallbacks(stats.finish, stats.fail)
+        return deferred
+
+    def stopService(self):
+        if self._threads:
+            self._threads.stop()
+            self._threads = None
+        if self._processes:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+        return super().stopService()
+
+
+def _handoff(future, deferred):
+    # back on the reactor
+    if future.cancelled():
+        deferred.cancel()
+    elif err := future.exception():
+        deferred.errback(err)
+    else:
+        deferred.callback(future.result())
+
+
+OFFLOAD = Offload()
+
+
+def run_offloaded(fn, *args, cpu=False, **kwargs):
+    """
+    Run `fn(*args, **kwargs)` in a worker thread, or a worker process if
+    `cpu` is set.
+
+    Returns:
+        Deferred: Fires on the reactor with what `fn` returned, or errbacks
+            with what it raised.
+    """
+    return OFFLOAD.run(fn, *args, cpu=cpu, **kwargs)
@@ -0,0 +1,163 @@
+"""
+Profiler
+
+A sampling profiler for the running server. While it's on, a background
+thread looks at what the reactor thread is doing a number of times a second
+and counts each stack it sees, so it costs the game very little and can be
+left on under real load.
+
+When it's stopped, the stacks are written out in the collapsed format that
+flamegraph tools (flamegraph.pl, speedscope, inferno) read, one
+`frame;frame;frame count` line per distinct stack.
+
+`PROFILER` is added to the server's services in
+`server/conf/server_services_plugins.py` and switched on and off with the
+`profile` command.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+from twisted.application.service import Service
+from evennia.utils import logger
+
+# samples a second, unless the profile command says otherwise
+DEFAULT_RATE = 100
+MAX_RATE = 1000
+# stops by itself after this many seconds, so it can't be forgotten about
+MAX_SECONDS = 600
+
+
+def frame_name(code):
+    path = code.co_filename
+    # enough of the path to tell modules apart
+    filename = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler(Service):
+    """
+    Samples the stack of the reactor thread from a thread of its own.
+    """
+
+    name = "ParagonsProfiler"
+
+    def __init__(self):
+        self.thread_id = threading.main_thread().ident
+        self.stacks = Counter()
+        self.samples = 0
+        self.rate = DEFAULT_RATE
+        self.started = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # code object: frame name, since the same ones come up over and over
+        self._names = {}
+
+    @property
+    def sampling(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, rate=DEFAULT_RATE):
+        """
+        Start sampling, throwing away any stacks from before.
+
+        Returns:
+            bool: False if it was already running.
+        """
+        if self.sampling:
+            return False
+        self.rate = max(1, min(rate, MAX_RATE))
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+        self.started = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """
+        Stop sampling and write out what was collected.
+
+        Returns:
+            str or None: The file written, if anything was sampled.
+        """
+        if not self._thread:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        return self.export()
+
+    def _run(self):
+        interval = 1 / self.rate
+        deadline = time.monotonic() + MAX_SECONDS
+        while not self._stop.wait(interval):
+            self.sample()
+            if time.monotonic() > deadline:
+                logger.log_info(f"Profiler stopped after {MAX_SECONDS}s.")
+                break
+
+    def sample(self):
+        if not (frame := sys._current_frames().get(self.thread_id)):
+            return
+        names = self._names
+        stack = []
+        while frame:
+            code = frame.f_code
+            if not (name := names.get(code)):
+                name = names[code] = frame_name(code)
+            stack.append(name)
+            frame = frame.f_back
+        stack.reverse()
+        with self._lock:
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def top(self, limit=20):
+        """
+        The functions seen most often, both on top of the stack and anywhere in it.
+
+        Returns:
+            list: (function, samples on top, samples anywhere), most on top first.
+        """
+        own = Counter()
+        total = Counter()
+        with self._lock:
+            stacks = list(self.stacks.items())
+        for stack, count in stacks:
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [(name, count, total[name]) for name, count in own.most_common(limit)]
+
+    def export(self, filename=None):
+        """
+        Write the collected stacks to a collapsed-stack file in the log directory.
+
+        Returns:
+            str or None: The file written, or None if nothing was sampled.
+        """
+        with self._lock:
+            stacks = list(self.stacks.items())
+        if not stacks:
+            return None
+        if not filename:
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+            filename = os.path.join(settings.LOG_DIR, f"profile-{stamp}.folded")
+        with open(filename, "w") as f:
+            for stack, count in stacks:
+                f.write(f"{stack} {count}\n")
+        return filename
+
+    def stopService(self):
+        self.stop()
+        return super().stopService()
+
+
+PROFILER = SamplingProfiler()
@@ -3,6 +3,29 @@ Prototypes
 """
 from random import randint
 
+
+class Drops:
+    """
+    A mob's drop table. Each entry is `(prototype key, min, max)`, and calling
+    it rolls a list of prototype keys to drop - so it can be used as a
+    prototype value and gets rolled when the mob is spawned, while the keys
+    are still there to be checked.
+    """
+
+    def __init__(self, *entries):
+        self.entries = entries
+
+    @property
+    def prototype_keys(self):
+        return [key for key, _, _ in self.entries]
+
+    def __call__(self):
+        drops = []
+        for key, low, high in self.entries:
+            drops += [key] * randint(low, high)
+        return drops
+
+
 ### Crafted prototypes which might be useful to access in other places, such as shops
 
 IRON_DAGGER = {
@@ -218,14 +241,6 @@ DRIFTWOOD = {
     "spawn_proto": "WOOD_LOG",
     "gathers": lambda: randint(1, 3),
 }
-WOOD_LOG = {
-    "key": "log of wood",
-    "desc": "A decent-sized wooden log. Not so big you can't carry it.",
-    "tags": [
-        ("wood", "crafting_material"),
-    ],
-    "value": 1,
-}
 
 
 ### Mobs
@@ -248,8 +263,7 @@ ANGRY_BEAR = {
         "energy_cost": 10,
     },
     "exp_reward": 10,
-    # randomly generate a list of drop prototype keys when the mob is spawned
-    "drops": lambda: ["BEAR_MEAT"] * randint(3, 5) + ["ANIMAL_HIDE"] * randint(0, 5),
+    "drops": Drops(("BEAR_MEAT", 3, 5), ("ANIMAL_HIDE", 0, 5)),
     "can_attack": True,
 }
 
@@ -272,8 +286,7 @@ COUGAR = {
         "energy_cost": 10,
     },
     "exp_reward": 10,
-    # randomly generate a list of drop prototype keys when the mob is spawned
-    "drops": lambda: ["RAW_MEAT"] * randint(0, 3) + ["ANIMAL_HIDE"] * randint(0, 2),
+    "drops": Drops(("RAW_MEAT", 0, 3), ("ANIMAL_HIDE", 0, 2)),
     "can_attack": True,
 }
 
@@ -283,7 +296,7 @@ SQUIRREL = {
     "desc": "Look! A squirrel!",
     "react_as": "timid",
     "gender": "neutral",
-    "drops": lambda: ["RAW_MEAT"] * randint(0, 1),
+    "drops": Drops(("RAW_MEAT", 0, 1)),
     "can_attack": True,
 }
 
@@ -293,7 +306,7 @@ PHEASANT = {
     "desc": "A healthy wild pheasant.",
     "react_as": "timid",
     "gender": "neutral",
-    "drops": lambda: ["RAW_MEAT"] * randint(0, 1),
+    "drops": Drops(("RAW_MEAT", 0, 1)),
     "can_attack": True,
 }
 
@@ -306,8 +319,7 @@ DOE_DEER = {
     "armor": 10,
     "agi": 15,
     "can_attack": True,
-    # randomly generate a list of drop prototype keys when the mob is spawned
-    "drops": lambda: ["DEER_MEAT"] * randint(1, 3) + ["ANIMAL_HIDE"] * randint(0, 3),
+    "drops": Drops(("DEER_MEAT", 1, 3), ("ANIMAL_HIDE", 0, 3)),
 }
 
 STAG_DEER = {
@@ -324,10 +336,7 @@ STAG_DEER = {
         "speed": 10,
         "energy_cost": 5,
     },
-    # randomly generate a list of drop prototype keys when the mob is spawned
-    "drops": lambda: ["DEER_MEAT"] * randint(1, 3)
-    + ["DEER_ANTLER"] * randint(0, 2)
-    + ["ANIMAL_HIDE"] * randint(0, 3),
+    "drops": Drops(("DEER_MEAT", 1, 3), ("DEER_ANTLER", 0, 2), ("ANIMAL_HIDE", 0, 3)),
     "exp_reward": 10,
     "can_attack": True,
 }
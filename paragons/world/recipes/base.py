@@ -1,11 +1,77 @@
-from random import randint 
-from evennia.utils import iter_to_str
+from collections import Counter
+from random import randint, choices
+from django.db import transaction
+from evennia.utils import iter_to_str, inherits_from
 from evennia.contrib.game_systems.crafting import CraftingRecipe
+from evennia.contrib.game_systems.crafting.crafting import CraftingValidationError
+
+from world.spawning import spawn
+
+
+def match_tags(objs, needed, category, count=1):
+    """
+    Set aside objects to cover `count` lots of the `needed` tags, looking at
+    each object's tags just once. An object is only ever used for one tag.
+
+    Args:
+        objs (list): The objects to pick from.
+        needed (Counter): How many of each tag one lot needs.
+        category (str): The tag category to match on.
+        count (int): How many lots to set aside.
+
+    Returns:
+        tuple: `(matched, unused)`, where `matched` maps each needed tag to the
+            objects set aside for it and `unused` lists all the others.
+    """
+    matched = {tag: [] for tag in needed}
+    unused = []
+    candidates = []
+    for obj in objs:
+        if tags := [tag for tag in obj.tags.get(category=category, return_list=True) if tag in needed]:
+            candidates.append((obj, tags))
+        else:
+            unused.append(obj)
+
+    # objects that fit fewer tags go first, so they don't lose their only
+    # slot to something that could have gone elsewhere
+    candidates.sort(key=lambda candidate: len(candidate[1]))
+    for obj, tags in candidates:
+        short = [tag for tag in tags if len(matched[tag]) < needed[tag] * count]
+        if short:
+            tag = max(short, key=lambda tag: needed[tag] * count - len(matched[tag]))
+            matched[tag].append(obj)
+        else:
+            unused.append(obj)
+
+    return matched, unused
+
+
+def lots_matched(matched, needed):
+    """
+    How many full lots of `needed` the result of `match_tags` covers.
+    """
+    if not needed:
+        return None
+    return min(len(matched[tag]) // amount for tag, amount in needed.items())
 
 
 class SkillRecipe(CraftingRecipe):
     skill = (None, 0)
     exp_gain = 0
+    # seconds each one takes when queued
+    craft_time = 5
+    # consumable_tags entries can be a tag, or a (tag, amount) tuple; this is
+    # the tally of them, and consumable_tags is flattened to one entry per item
+    ingredients = Counter()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "consumable_tags" in cls.__dict__:
+            cls.ingredients = Counter()
+            for spec in cls.consumable_tags:
+                tag, amount = (spec, 1) if isinstance(spec, str) else spec
+                cls.ingredients[tag] += amount
+            cls.consumable_tags = list(cls.ingredients.elements())
 
     def craft(self, **kwargs):
         # set at initialization
@@ -30,6 +96,7 @@ class SkillRecipe(CraftingRecipe):
         success_rate = crafting_skill.value - difficulty 
 
         crafter.traits.fp.current -= 5
+        crafter.vitals.changed()
 
         if self.exp_gain:
             exp = crafter.attributes.get("exp", 0)
@@ -39,4 +106,128 @@ class SkillRecipe(CraftingRecipe):
             self.msg("It doesn't work out, maybe you should try again?")
             return 
         
-        return super().craft(**kwargs)
\ No newline at end of file
+        return super().craft(**kwargs)
+
+    def pre_craft(self, **kwargs):
+        inputs = [
+            obj
+            for obj in self.inputs
+            if obj and inherits_from(obj, "evennia.objects.models.ObjectDB")
+        ]
+        tools_needed = Counter(self.tool_tags)
+        tools, rest = match_tags(inputs, tools_needed, self.tool_tag_category)
+        consumables, excess = match_tags(rest, self.ingredients, self.consumable_tag_category)
+
+        self.validated_tools = [obj for objs in tools.values() for obj in objs]
+        self.validated_consumables = [obj for objs in consumables.values() for obj in objs]
+
+        if missing := [tag for tag, amount in tools_needed.items() if len(tools[tag]) < amount]:
+            err = self._format_message(self.error_tool_missing_message, missing=missing)
+            self.msg(err)
+            raise CraftingValidationError(err)
+        if missing := [
+            tag for tag, amount in self.ingredients.items() if len(consumables[tag]) < amount
+        ]:
+            err = self._format_message(self.error_consumable_missing_message, missing=missing)
+            self.msg(err)
+            raise CraftingValidationError(err)
+        if excess and (self.exact_tools or self.exact_consumables):
+            err = self._format_message(
+                self.error_consumable_excess_message,
+                excess=[obj.get_display_name(looker=self.crafter) for obj in excess],
+            )
+            self.msg(err)
+            raise CraftingValidationError(err)
+
+    def post_craft(self, craft_result, **kwargs):
+        craft_result = super().post_craft(craft_result, **kwargs)
+        # CmdCraft hands over the results by setting their location, which
+        # skips the receive hooks keeping the crafter's carry count
+        for obj in craft_result or []:
+            obj.location = self.crafter
+            self.crafter.carried.add(obj)
+        return craft_result
+
+    @classmethod
+    def craft_batch(cls, crafter, count=1, **kwargs):
+        """
+        Craft this recipe `count` times in one go, using whatever tools and
+        materials the crafter has on hand. The skill and tool checks, focus
+        cost and exp are all handled once for the whole batch.
+
+        Returns:
+            list or None: The crafted objects, or None if the crafter doesn't
+                have what they need to attempt it.
+        """
+        req_skill, difficulty = cls.skill
+        success_rate = None
+        if req_skill and difficulty:
+            if not (crafting_skill := crafter.traits.get(req_skill)):
+                crafter.msg("You do not know how to make this.")
+                return None
+            skill_value = crafting_skill.value
+            if skill_value < difficulty:
+                crafter.msg("You are not good enough to make this yet. Better keep practicing!")
+                return None
+            success_rate = int(skill_value - difficulty)
+
+        # tools can be carried or part of the room, and are only needed once
+        nearby = list(crafter.contents)
+        if location := crafter.location:
+            nearby += [obj for obj in location.contents if obj != crafter]
+        tools_needed = Counter(cls.tool_tags)
+        tools, _ = match_tags(nearby, tools_needed, cls.tool_tag_category)
+        if missing := [tag for tag, amount in tools_needed.items() if len(tools[tag]) < amount]:
+            crafter.msg(f"You need {iter_to_str(missing)} to make this.")
+            return None
+
+        # set aside enough materials for the whole batch from one pass
+        tool_objs = {obj for objs in tools.values() for obj in objs}
+        materials, _ = match_tags(
+            [obj for obj in crafter.contents if obj not in tool_objs],
+            cls.ingredients,
+            cls.consumable_tag_category,
+            count,
+        )
+        if (lots := lots_matched(materials, cls.ingredients)) is not None:
+            count = min(count, lots)
+        if count < 1:
+            crafter.msg(f"You don't have the materials to make {cls.name}.")
+            return None
+
+        successes = count
+        if success_rate is not None:
+            # one roll per attempt, all at once; a 0 is a failure
+            successes -= choices(range(success_rate + 1), k=count).count(0)
+
+        results = []
+        if successes:
+            # made before anything is used up, so if spawning fails the
+            # crafter keeps their materials
+            with transaction.atomic():
+                results = spawn(*list(cls.output_prototypes) * successes)
+                for tag, amount in cls.ingredients.items():
+                    for obj in materials[tag][: amount * successes]:
+                        obj.delete()
+
+        if success_rate is not None:
+            crafter.traits.fp.current -= 5 * count
+            crafter.vitals.changed()
+            if cls.exp_gain:
+                crafter.db.exp = crafter.attributes.get("exp", 0) + cls.exp_gain * count
+
+        if not successes:
+            crafter.msg("It doesn't work out, maybe you should try again?")
+            return []
+
+        for obj in results:
+            obj.location = crafter
+            crafter.carried.add(obj)
+
+        if failed := count - successes:
+            crafter.msg(
+                f"You craft {successes} {cls.name}, but {failed} attempt{'' if failed == 1 else 's'} didn't work out."
+            )
+        else:
+            crafter.msg(f"You craft {successes} {cls.name}.")
+        return results
@@ -11,7 +11,7 @@ class SmallBagRecipe(SkillRecipe):
 
     name = "small bag"
     tool_tags = ["heavy needle"]
-    consumable_tags = ["leather" * 2]
+    consumable_tags = [("leather", 2)]
     output_prototypes = ["SMALL_BAG"]
 
 
@@ -25,7 +25,7 @@ class MediumBagRecipe(SkillRecipe):
 
     name = "medium bag"
     tool_tags = ["heavy needle"]
-    consumable_tags = ["leather" * 3]
+    consumable_tags = [("leather", 3)]
     output_prototypes = ["MEDIUM_BAG"]
 
 
@@ -38,6 +38,6 @@ class LargeBagRecipe(SkillRecipe):
 
     name = "large bag"
     tool_tags = ["heavy needle"]
-    consumable_tags = ["leather" * 4]
+    consumable_tags = [("leather", 4)]
     output_prototypes = ["LARGE_BAG"]
     
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""
+Recipe registry
+
+Indexes every SkillRecipe in `settings.CRAFT_RECIPE_MODULES` by the tags and
+skill level it needs, so finding out what someone can craft is a lookup on
+the tags they have on hand rather than a trial craft of every recipe.
+
+The index is built at server start (see `server/conf/at_server_startstop.py`)
+and otherwise on first use.
+"""
+from collections import Counter, defaultdict
+from django.conf import settings
+from evennia.utils import logger, make_iter, callables_from_module, inherits_from
+
+from .base import SkillRecipe
+
+_TOOL_CATEGORY = SkillRecipe.tool_tag_category
+_MATERIAL_CATEGORY = SkillRecipe.consumable_tag_category
+
+# recipe name: recipe class
+_RECIPES = {}
+# recipe name: Counter of (tag, category) it needs
+_REQUIREMENTS = {}
+# (tag, category): [(recipe name, amount needed), ...]
+_BY_TAG = defaultdict(list)
+# skill key: [(difficulty, recipe name), ...], sorted by difficulty
+_BY_SKILL = defaultdict(list)
+# recipes that don't need any tools or materials at all
+_NO_REQUIREMENTS = []
+
+
+def build_index():
+    """
+    (Re)build the recipe index from the recipe modules.
+    """
+    _RECIPES.clear()
+    _REQUIREMENTS.clear()
+    _BY_TAG.clear()
+    _BY_SKILL.clear()
+    _NO_REQUIREMENTS.clear()
+
+    for path in make_iter(getattr(settings, "CRAFT_RECIPE_MODULES", [])):
+        for cls in callables_from_module(path).values():
+            if not inherits_from(cls, SkillRecipe) or cls is SkillRecipe:
+                continue
+            if cls.name in _RECIPES and _RECIPES[cls.name] is not cls:
+                logger.log_warn(
+                    f"Recipe name '{cls.name}' is used by both {_RECIPES[cls.name]} and {cls}."
+                )
+            _RECIPES[cls.name] = cls
+
+    for name, cls in _RECIPES.items():
+        needs = Counter((tag, _TOOL_CATEGORY) for tag in cls.tool_tags)
+        needs.update({(tag, _MATERIAL_CATEGORY): amount for tag, amount in cls.ingredients.items()})
+        _REQUIREMENTS[name] = needs
+
+        if needs:
+            for tagkey, amount in needs.items():
+                _BY_TAG[tagkey].append((name, amount))
+        else:
+            _NO_REQUIREMENTS.append(name)
+
+        skill, difficulty = cls.skill
+        if skill and difficulty:
+            _BY_SKILL[skill].append((difficulty, name))
+
+    for recipes in _BY_SKILL.values():
+        recipes.sort()
+
+    return _RECIPES
+
+
+def get_recipes():
+    """
+    Returns:
+        dict: All indexed recipe classes, keyed by recipe name.
+    """
+    if not _RECIPES:
+        build_index()
+    return _RECIPES
+
+
+def get_recipe(name):
+    return get_recipes().get(name)
+
+
+def search_recipe(name):
+    """
+    Find a recipe by its exact name, or else by a unique partial match.
+
+    Returns:
+        SkillRecipe or None: The recipe class, if one matched.
+    """
+    recipes = get_recipes()
+    if recipe := recipes.get(name):
+        return recipe
+    matches = [key for key in recipes if key.startswith(name)]
+    if not matches:
+        matches = [key for key in recipes if name in key]
+    if len(matches) == 1:
+        return recipes[matches[0]]
+    return None
+
+
+def recipes_for_skill(skill, level=None):
+    """
+    Get the names of the recipes using a skill, easiest first.
+
+    Args:
+        skill (str): The skill key.
+        level (int, optional): Only include recipes at or below this difficulty.
+    """
+    get_recipes()
+    return [
+        name for difficulty, name in _BY_SKILL.get(skill, []) if level is None or difficulty <= level
+    ]
+
+
+def available_tags(crafter):
+    """
+    Count the crafting tags a crafter has access to - materials they carry, and
+    tools they carry or can use where they're standing.
+
+    Returns:
+        Counter: A multiset of `(tag, category)`.
+    """
+    tags = Counter()
+    for obj in crafter.contents:
+        tags.update(
+            tagkey
+            for tagkey in obj.tags.all(return_key_and_category=True)
+            if tagkey[1] in (_TOOL_CATEGORY, _MATERIAL_CATEGORY)
+        )
+    if location := crafter.location:
+        for obj in location.contents:
+            if obj == crafter:
+                continue
+            tags.update(
+                tagkey
+                for tagkey in obj.tags.all(return_key_and_category=True)
+                if tagkey[1] == _TOOL_CATEGORY
+            )
+    return tags
+
+
+def craftable(crafter, tags=None):
+    """
+    Find every recipe the crafter could make right now.
+
+    Args:
+        crafter (Object): The one who'd be crafting.
+        tags (Counter, optional): The tags to match against, as returned from
+            `available_tags`. Looked up from the crafter if not given.
+
+    Returns:
+        list: The matching recipe classes, sorted by name.
+    """
+    get_recipes()
+    if tags is None:
+        tags = available_tags(crafter)
+
+    # count how many of each recipe's requirements are covered; only recipes
+    # sharing a tag with the crafter get looked at
+    covered = Counter()
+    for tagkey, have in tags.items():
+        for name, needed in _BY_TAG.get(tagkey, ()):
+            if have >= needed:
+                covered[name] += 1
+    names = [name for name, count in covered.items() if count == len(_REQUIREMENTS[name])]
+    names += _NO_REQUIREMENTS
+
+    skills = {}
+    recipes = []
+    for name in names:
+        cls = _RECIPES[name]
+        skill, difficulty = cls.skill
+        if skill and difficulty:
+            if skill not in skills:
+                trait = crafter.traits.get(skill)
+                skills[skill] = trait.value if trait else 0
+            if skills[skill] < difficulty:
+                continue
+        recipes.append(cls)
+
+    return sorted(recipes, key=lambda cls: cls.name)
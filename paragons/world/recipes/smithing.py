@@ -7,10 +7,11 @@ class SmeltIronRecipe(SkillRecipe):
     """
     skill = ("smithing", 1)
     exp_gain = 1
+    craft_time = 3
 
     name = "iron ingot"
     tool_tags = ["furnace"]
-    consumable_tags = ["iron ore" * 2]
+    consumable_tags = [("iron ore", 2)]
     output_prototypes = [
         {
             "key": "iron ingot",
@@ -57,7 +58,7 @@ class IronLongBladeRecipe(SkillRecipe):
 
     name = "long iron blade"
     tool_tags = ["hammer", "anvil", "furnace"]
-    consumable_tags = ["iron ingot" * 2]
+    consumable_tags = [("iron ingot", 2)]
     output_prototypes = [
         {
             "key": "long iron blade",
@@ -80,7 +81,7 @@ class IronGreatBladeRecipe(SkillRecipe):
 
     name = "iron great blade"
     tool_tags = ["hammer", "anvil", "furnace"]
-    consumable_tags = ["iron ingot" * 3]
+    consumable_tags = [("iron ingot", 3)]
     output_prototypes = [
         {
             "key":"massive iron blade",
@@ -120,7 +121,7 @@ class LargePommelRecipe(SkillRecipe):
     exp_gain = 3
 
     name = "large pommel"
-    tooL_tags = ["hammer", "anvil", "furnace"]
+    tool_tags = ["hammer", "anvil", "furnace"]
     consumable_tags = ["ingot"]
     output_prototypes = [
         {
@@ -180,6 +181,7 @@ class IronDaggerRecipe(SkillRecipe):
   """  
   skill = ("smithing", 5)
   exp_gain = 10
+  craft_time = 10
 
   name = "dagger"
   tool_tags = ["hammer", "anvil", "furnace"]
@@ -199,6 +201,7 @@ class IronSwordRecipe(SkillRecipe):
 
     skill = ("smithing", 10)
     exp_gain = 10
+    craft_time = 10
 
     name = "sword"
     tool_tags = ["hammer", "anvil", "furnace"]
@@ -217,6 +220,7 @@ class IronGreatswordRecipe(SkillRecipe):
     """
     skill = ("smithing", 15)
     exp_gain = 10
+    craft_time = 15
     
     name = "greatsword"
     tool_tags = ["hammer", "anvil", "furnace"]
@@ -237,7 +241,7 @@ class IronHeavyWireRecipe(SkillRecipe):
     skill = ("smithing", 10)
     exp_gain = 2
 
-    nane = "heavy iron wire"
+    name = "heavy iron wire"
     tool_tags = ["drawing_die", "smithing_tongs", "furnace"]
     consumable_tags = ["iron ingot"]
     output_prototypes = [
@@ -258,7 +262,7 @@ class CopperHeavyWireRecipe(SkillRecipe):
     skill = ("smithing", 5)
     exp_gain = 2
 
-    name = "heavy iron wire"
+    name = "heavy copper wire"
     tool_tags = ["drawing_die", "smithing_tongs", "furnace"]
     consumable_tags = ["copper ingot"]
     output_prototypes = [
@@ -302,7 +306,7 @@ class IronChainmailShirtRecipe(SkillRecipe):
 
     name = "iron chausses"
     tool_tags = ["wire_cutter", "pliers"]
-    consumable_tags = ["heavy iron wire" * 3]
+    consumable_tags = [("heavy iron wire", 3)]
     output_prototypes = ["IRON_CHAUSSES"]
 
 
@@ -324,8 +328,7 @@ class HeavyIronNeedleRecipe(SkillRecipe):
             "tags": [("heavy needle", "crafting_tool")],
             "value": 3
         }
-        * 3
-    ]
+    ] * 3
 
 
 class HeavyCopperNeedleRecipe(SkillRecipe):
@@ -346,5 +349,4 @@ class HeavyCopperNeedleRecipe(SkillRecipe):
             "tags": [("heavy needle", "crafting_tool")],
             "value": 3
         }
-        * 3
-    ]
\ No newline at end of file
+    ] * 3
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""
+Spawning
+
+A drop-in for `evennia.prototypes.spawner.spawn` that compiles each prototype
+key once - looking it up, resolving its parents and working out every field
+that can't change between spawns - and caches the result. Only the dynamic
+fields (callables like `lambda: randint(2, 10)` and `$protfunc(...)` strings)
+are evaluated per spawn, so spawning is mostly down to creating the objects.
+
+Prototypes given as dicts rather than keys aren't cached, but are still
+created in the same batch.
+
+`precompile_prototypes` checks and compiles every prototype up front, and is
+run at server start.
+
+The cache is cleared whenever a database prototype is saved or deleted; call
+`clear_prototype_cache` after changing prototype modules on a running server.
+"""
+import time
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from evennia.objects.models import ObjectDB
+from evennia.prototypes import prototypes as protlib
+from evennia.prototypes.models import DbPrototype
+from evennia.prototypes.spawner import (
+    spawn as _spawn,
+    batch_create_object,
+    _get_prototype,
+    _PROTOTYPE_META_NAMES,
+    _NON_CREATE_KWARGS,
+)
+from evennia.prototypes.prototypes import (
+    PROTOTYPE_TAG_CATEGORY,
+    init_spawn_value,
+    value_to_obj,
+    value_to_obj_or_any,
+)
+from evennia.utils import logger, make_iter, class_from_module
+
+# prototype key: CompiledPrototype
+_COMPILED = {}
+
+
+def _copy(value):
+    # containers are copied all the way down, anything else (objects
+    # included) is shared
+    if isinstance(value, dict):
+        return {key: _copy(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return type(value)(_copy(val) for val in value)
+    return value
+
+
+def _is_dynamic(value):
+    if callable(value):
+        return True
+    if isinstance(value, (list, tuple)) and value and callable(value[0]):
+        return True
+    return isinstance(value, str) and "$" in value
+
+
+class CompiledPrototype:
+    """
+    The parts of a prototype that are the same for every spawn, worked out
+    once, plus the raw values of the parts that aren't.
+    """
+
+    def __init__(self, prototype_key):
+        prototype = protlib.search_prototype(prototype_key, require_single=True)[0]
+        prototype = protlib.homogenize_prototype(prototype)
+        protlib.validate_prototype(prototype, None, protparents={}, is_prototype_base=True)
+        self.prototype = prototype
+        self.prototype_key = prototype.get("prototype_key", prototype_key)
+
+        prot = _get_prototype(
+            prototype, protparents={}, uninherited={"prototype_key": self.prototype_key}
+        )
+
+        # static values are initialized here, dynamic ones kept as they are
+        # and initialized on each spawn
+        self.static_kwargs = {}
+        self.dynamic_kwargs = {}
+
+        key = prot.pop("key", None)
+        if _is_dynamic(key):
+            self.dynamic_kwargs["db_key"] = (key, str)
+        elif key:
+            self.static_kwargs["db_key"] = self._init(key, str)
+        for name in ("location", "destination"):
+            val = prot.pop(name, None)
+            if _is_dynamic(val):
+                self.dynamic_kwargs[f"db_{name}"] = (val, value_to_obj)
+            elif val:
+                self.static_kwargs[f"db_{name}"] = self._init(val, value_to_obj)
+        home = prot.pop("home", None)
+        if _is_dynamic(home):
+            self.dynamic_kwargs["db_home"] = (home, value_to_obj)
+        else:
+            try:
+                self.static_kwargs["db_home"] = self._init(
+                    home or settings.DEFAULT_HOME, value_to_obj
+                )
+            except ObjectDB.DoesNotExist:
+                pass
+
+        typeclass = class_from_module(
+            self._init(prot.pop("typeclass", settings.BASE_OBJECT_TYPECLASS), str),
+            settings.TYPECLASS_PATHS,
+        )
+        self.static_kwargs["db_typeclass_path"] = f"{typeclass.__module__}.{typeclass.__name__}"
+
+        self.permissions = self._init(prot.pop("permissions", []), make_iter)
+        self.locks = self._init(prot.pop("locks", ""), str)
+        self.aliases = self._init(prot.pop("aliases", []), make_iter)
+        self.execs = self._init(prot.pop("exec", ""), make_iter)
+
+        self.static_tags = [(self.prototype_key, PROTOTYPE_TAG_CATEGORY, None)]
+        self.dynamic_tags = []
+        for tag, category, *data in prot.pop("tags", []):
+            if _is_dynamic(tag):
+                self.dynamic_tags.append((tag, category, data[0] if data else None))
+            else:
+                self.static_tags.append((self._init(tag, str), category, data[0] if data else None))
+
+        self.static_attrs = []
+        self.dynamic_attrs = []
+        for attrname, value, *rest in make_iter(prot.pop("attrs", [])):
+            if attrname not in _NON_CREATE_KWARGS:
+                attr = (attrname, value, rest[0] if rest else None, rest[1] if len(rest) > 1 else None)
+                self._add_attr(attr, None)
+
+        self.static_nattrs = {}
+        self.dynamic_nattrs = {}
+        # static nattrs holding lists, dicts and so on, which are copied for
+        # each spawn so objects don't end up sharing them; attributes are
+        # pickled when saved, so don't need it
+        self.mutable_nattrs = []
+        for name, value in list(prot.items()):
+            if name.startswith("ndb_"):
+                prot.pop(name)
+                name = name.split("_", 1)[1]
+                if _is_dynamic(value):
+                    self.dynamic_nattrs[name] = value
+                else:
+                    value = self.static_nattrs[name] = self._init(value, value_to_obj)
+                    if isinstance(value, (dict, list, tuple, set)):
+                        self.mutable_nattrs.append(name)
+
+        for name, value in prot.items():
+            if name not in _PROTOTYPE_META_NAMES and name not in _NON_CREATE_KWARGS:
+                self._add_attr((name, value, None, None), value_to_obj_or_any)
+
+    def _init(self, value, validator=None, caller=None):
+        return init_spawn_value(value, validator, caller=caller, prototype=self.prototype)
+
+    def _add_attr(self, attr, validator):
+        name, value, category, locks = attr
+        if _is_dynamic(value):
+            self.dynamic_attrs.append((attr, validator))
+        else:
+            self.static_attrs.append((name, self._init(value, validator), category, locks))
+
+    def objparams(self, caller=None):
+        """
+        Build the parameters `batch_create_object` needs for one object.
+        """
+        create_kwargs = dict(self.static_kwargs)
+        for name, (value, validator) in self.dynamic_kwargs.items():
+            create_kwargs[name] = self._init(value, validator, caller=caller)
+        if "db_key" not in create_kwargs:
+            create_kwargs["db_key"] = f"Spawned-{time.time():.0f}"
+
+        tags = list(self.static_tags)
+        tags.extend(
+            (self._init(tag, str, caller=caller), category, data)
+            for tag, category, data in self.dynamic_tags
+        )
+
+        attrs = list(self.static_attrs)
+        attrs.extend(
+            (name, self._init(value, validator, caller=caller), category, locks)
+            for (name, value, category, locks), validator in self.dynamic_attrs
+        )
+
+        nattrs = dict(self.static_nattrs)
+        for name in self.mutable_nattrs:
+            nattrs[name] = _copy(nattrs[name])
+        for name, value in self.dynamic_nattrs.items():
+            nattrs[name] = self._init(value, value_to_obj, caller=caller)
+
+        return (
+            create_kwargs,
+            list(self.permissions),
+            self.locks,
+            list(self.aliases),
+            nattrs,
+            attrs,
+            tags,
+            self.execs,
+        )
+
+
+def compile_prototype(prototype_key):
+    """
+    Get the compiled version of a prototype, compiling it if needed.
+
+    Raises:
+        KeyError: If there's no single prototype with this key.
+    """
+    key = prototype_key.lower()
+    if not (compiled := _COMPILED.get(key)):
+        compiled = _COMPILED[key] = CompiledPrototype(key)
+    return compiled
+
+
+def clear_prototype_cache(prototype_key=None):
+    """
+    Throw away compiled prototypes, either one or all of them.
+    """
+    if prototype_key:
+        _COMPILED.pop(prototype_key.lower(), None)
+    else:
+        _COMPILED.clear()
+
+
+def spawn(*prototypes, caller=None, **kwargs):
+    """
+    Spawn objects from prototype keys or prototype dicts, like Evennia's
+    `spawn`, but using compiled prototypes for the keys.
+
+    Returns:
+        list: The spawned objects.
+    """
+    if kwargs:
+        # anything special is left to the full spawner
+        return _spawn(*prototypes, caller=caller, **kwargs)
+
+    objparams = []
+    for prototype in prototypes:
+        if isinstance(prototype, str):
+            objparams.append(compile_prototype(prototype).objparams(caller=caller))
+        else:
+            # the full spawner only homogenizes when it's creating the objects
+            # itself, and dicts need their prototype_key and typeclass filled in
+            prototype = protlib.homogenize_prototype(prototype)
+            objparams.extend(_spawn(prototype, caller=caller, only_validate=True))
+    return batch_create_object(*objparams)
+
+
+class PrototypeError(Exception):
+    pass
+
+
+def _check_references(prototype, known):
+    """
+    Check the prototype keys a prototype refers to, and that its values can
+    be rolled.
+
+    Returns:
+        list: Problems found, as strings.
+    """
+    from world.prototypes import Drops
+
+    errors = []
+    name = prototype.get("prototype_key")
+
+    if (spawn_proto := prototype.get("spawn_proto")) and spawn_proto.lower() not in known:
+        errors.append(f"{name}: spawn_proto '{spawn_proto}' doesn't exist.")
+
+    if "gathers" in prototype:
+        try:
+            gathers = init_spawn_value(prototype["gathers"])
+        except Exception as err:
+            errors.append(f"{name}: gathers failed to roll: {err}")
+        else:
+            if not isinstance(gathers, int):
+                errors.append(f"{name}: gathers rolled {gathers!r} instead of a number.")
+
+    if drops := prototype.get("drops"):
+        if isinstance(drops, Drops):
+            keys = drops.prototype_keys
+        elif _is_dynamic(drops):
+            # plain callables can't be checked without rolling them
+            keys = []
+        else:
+            keys = make_iter(drops)
+        for key in keys:
+            if key.lower() not in known:
+                errors.append(f"{name}: drop '{key}' doesn't exist.")
+
+    return errors
+
+
+def precompile_prototypes():
+    """
+    Check every prototype and the prototype keys the game refers to, and
+    compile all of them into the spawn cache. Meant to be run at server start,
+    so broken prototypes show up right away instead of on first spawn.
+
+    Raises:
+        PrototypeError: Listing everything wrong, if anything was.
+    """
+    from world.maps.overworld import MAP_KEY
+
+    start = time.perf_counter()
+    clear_prototype_cache()
+
+    all_prototypes = protlib.search_prototype()
+    known = {prototype["prototype_key"].lower() for prototype in all_prototypes}
+
+    errors = []
+    for prototype in all_prototypes:
+        key = prototype["prototype_key"]
+        try:
+            compile_prototype(key)
+        except Exception as err:
+            errors.append(f"{key}: {err}")
+        errors.extend(_check_references(prototype, known))
+
+    for tile, tile_data in MAP_KEY.items():
+        for field in ("gathers", "mobs"):
+            for key, _ in tile_data.get(field) or ():
+                if key.lower() not in known:
+                    errors.append(f"MAP_KEY '{tile}': {field} '{key}' doesn't exist.")
+
+    if errors:
+        raise PrototypeError(
+            f"{len(errors)} prototype problem(s) found:\n  " + "\n  ".join(errors)
+        )
+
+    logger.log_info(
+        f"Compiled {len(_COMPILED)} prototypes in {(time.perf_counter() - start) * 1000:.1f}ms."
+    )
+
+
+def _clear_on_change(sender, instance, **kwargs):
+    clear_prototype_cache()
+
+
+post_save.connect(_clear_on_change, sender=DbPrototype, dispatch_uid="paragons_prototype_cache")
+post_delete.connect(_clear_on_change, sender=DbPrototype, dispatch_uid="paragons_prototype_cache")